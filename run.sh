@@ -1,3 +1,2 @@
 #!/bin/bash
-python scheduler.py &
-python run.py
\ No newline at end of file
+python run.py
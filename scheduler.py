@@ -1,45 +1,53 @@
 """
 Script that manges the scheduled running of 
-a model and its updating in the server application.
+model training in a separate, low-priority process.
 """
+import sys
 import time 
 import schedule 
-import requests
+import subprocess
 
 from sanic.log import logger
-from skill.word2vec import Model
+from skill.catalog import filter_listings
+from skill.bitcointalk import BitcoinTalk
+from skill.coinmarketcap import CoinMarketCap
 
 
-def train_and_query():
+def train():
     """
-    Trains the word2vec model, generating a new
-    tained model file into the specified MODELS_PATH
-    path. Then hits the /update endpoint for updating
-    the model with the latest available data.
+    Trains the word2vec model in a separate process
+    (see train.py), generating a new trained model file
+    into the specified MODELS_PATH path. The server picks
+    the new model up from the published manifest.
     """
-    Model().train()
-    try:
-        r = requests.get('http://localhost:8000/update')
-        if r.status_code != 200:
-            logger.info("Failure!")
-        try:
-            if r.json()['success'] == True:
-                logger.info("Success is good!")
-            else:
-                logger.error('JSON does not have Success as True')
-        except ValueError: 
-            logger.error("There is no JSON Object")
+    result = subprocess.run([sys.executable, 'train.py'])
+    if result.returncode != 0:
+        logger.error(f'Training failed with exit code {result.returncode}.')
+    else:
+        logger.info('Training finished.')
+
 
-    except requests.exceptions.ConnectionError:
-        logger.error("No connection Found.")
+def prune_coins():
+    """
+    Removes coins that are no longer listed from the
+    coin catalog in the database. Workers only add
+    coins to it, so this runs here, once a day.
+    """
+    try:
+        coins = filter_listings(CoinMarketCap.listings())
+        removed = BitcoinTalk().prune_coins(coins)
+        logger.info(f'Removed {removed} unlisted coin(s) from the catalog.')
+    except Exception as e:
+        logger.error(f'Could not prune the coin catalog: {e}')
 
 
 if __name__ == '__main__':
     #
-    #  Schedule the tain_and_query function
+    #  Schedule the train function
     #  and run it on the scheduler time.
     #
-    schedule.every().monday.at("2:00").do(train_and_query)
+    schedule.every().monday.at("2:00").do(train)
+    schedule.every().day.at("3:00").do(prune_coins)
 
     while True:
         schedule.run_pending()
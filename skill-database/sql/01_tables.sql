@@ -19,6 +19,7 @@ CREATE TABLE IF NOT EXISTS message (
     content_no_html TEXT,
     content_no_quote TEXT,
     content_no_quote_no_html TEXT,
+    content_tsv TSVECTOR,
     db_update_time TIMESTAMP WITH TIME ZONE DEFAULT current_timestamp,
     PRIMARY KEY (sid)
 );
@@ -26,6 +27,7 @@ CREATE INDEX ON message (topic, topic_position);
 CREATE INDEX ON message (topic, member);
 CREATE INDEX ON message (member, topic);
 CREATE INDEX ON message (post_time);
+CREATE INDEX IF NOT EXISTS message_content_tsv_idx ON message USING GIN (content_tsv);
 
 CREATE TABLE IF NOT EXISTS topic (
     sid INTEGER,
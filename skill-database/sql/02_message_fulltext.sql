@@ -0,0 +1,19 @@
+/*
+
+    MESSAGE FULL-TEXT SEARCH
+    ------------------------
+
+    Adds the stored full-text search vector of
+    messages and its GIN index. New messages get
+    their vector from the scraper on insert. This
+    file is safe to run against existing databases
+    (as a migration) and against new ones.
+
+*/
+ALTER TABLE message ADD COLUMN IF NOT EXISTS content_tsv TSVECTOR;
+
+UPDATE message
+    SET content_tsv = to_tsvector('english', coalesce(content_no_quote_no_html, ''))
+    WHERE content_tsv IS NULL;
+
+CREATE INDEX IF NOT EXISTS message_content_tsv_idx ON message USING GIN (content_tsv);
@@ -0,0 +1,31 @@
+/*
+
+    COIN MENTIONS
+    -------------
+
+    Catalog of coins searched by the skill, and
+    the latest message that mentions each one of
+    them. The catalog is written by the skill
+    application; the latest mentions are kept
+    up-to-date by the scraper as new messages
+    are inserted. This file is safe to run against
+    existing databases (as a migration) and
+    against new ones.
+
+*/
+CREATE TABLE IF NOT EXISTS coin (
+    name TEXT,
+    slug TEXT,
+    symbol TEXT,
+    db_update_time TIMESTAMP WITH TIME ZONE DEFAULT current_timestamp,
+    PRIMARY KEY (name)
+);
+
+CREATE TABLE IF NOT EXISTS coin_latest_mention (
+    coin TEXT,
+    message_sid BIGINT,
+    link TEXT,
+    post_time TIMESTAMP,
+    db_update_time TIMESTAMP WITH TIME ZONE DEFAULT current_timestamp,
+    PRIMARY KEY (coin)
+);
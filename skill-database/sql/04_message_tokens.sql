@@ -0,0 +1,23 @@
+/*
+
+    MESSAGE TOKENS
+    --------------
+
+    Tokenized sentences of messages, keyed by
+    message and preprocessing version. Training
+    only tokenizes messages that are not in this
+    table yet (or that changed since they were
+    tokenized) and reads the rest back from it.
+    Sentences are stored one per line, with words
+    separated by spaces. This file is safe to run
+    against existing databases (as a migration)
+    and against new ones.
+
+*/
+CREATE TABLE IF NOT EXISTS message_tokens (
+    sid BIGINT,
+    version INTEGER,
+    sentences TEXT,
+    db_update_time TIMESTAMP WITH TIME ZONE DEFAULT current_timestamp,
+    PRIMARY KEY (sid, version)
+);
@@ -0,0 +1,38 @@
+/*
+
+    PRICE HISTORY
+    -------------
+
+    Daily prices of every coin, in the same format
+    as the historical data from CoinMarketCap. The
+    skill appends the days missing for a coin when
+    its history is requested, and reads any window
+    with a range scan over the primary key. This
+    file is safe to run against existing databases
+    (as a migration) and against new ones.
+
+    The range of days already checked for every
+    coin is kept apart from the prices, so days a
+    coin did not trade (e.g. before it was listed)
+    are not requested again.
+
+*/
+CREATE TABLE IF NOT EXISTS price_history (
+    slug TEXT,
+    date DATE,
+    open DOUBLE PRECISION,
+    high DOUBLE PRECISION,
+    low DOUBLE PRECISION,
+    close DOUBLE PRECISION,
+    volume DOUBLE PRECISION,
+    market_cap DOUBLE PRECISION,
+    db_update_time TIMESTAMP WITH TIME ZONE DEFAULT current_timestamp,
+    PRIMARY KEY (slug, date)
+);
+
+CREATE TABLE IF NOT EXISTS price_history_coverage (
+    slug TEXT PRIMARY KEY,
+    checked_from DATE,
+    checked_to DATE,
+    db_update_time TIMESTAMP WITH TIME ZONE DEFAULT current_timestamp
+);
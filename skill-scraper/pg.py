@@ -14,6 +14,8 @@ import unittest
 # Configuration variables
 tables = {
     "board": "board",
+    "coin": "coin",
+    "coin_latest_mention": "coin_latest_mention",
     "member": "member",
     "message": "message",
     "topic": "topic"
@@ -102,6 +104,14 @@ def _insertBatch(data, tableLabel):
         ",".join(tableFields),
         ",".join(["%({0})s".format(field) for field in dataFields])), data)
 
+    # Compute the full-text search vector of messages
+    if tableLabel == 'message':
+        cursor.execute("""
+            UPDATE {0}
+            SET content_tsv = to_tsvector(
+                'english', coalesce(content_no_quote_no_html, ''))""".format(
+            stagingTable))
+
     # Delete old data from original table
     cursor.execute("""
         DELETE FROM {0} t
@@ -114,6 +124,10 @@ def _insertBatch(data, tableLabel):
         (SELECT *
         FROM {1})""".format(table, stagingTable))
 
+    # Keep the latest mention of each coin up-to-date
+    if tableLabel == 'message':
+        _updateLatestMentions(cursor, stagingTable)
+
     # Drop the staging table
     cursor.execute("""
         DROP TABLE {0}""".format(stagingTable))
@@ -122,6 +136,26 @@ def _insertBatch(data, tableLabel):
     cursor.execute("COMMIT")
 
 
+def _updateLatestMentions(cursor, stagingTable):
+    """Update the latest mention of coins found in staged messages."""
+    cursor.execute("""
+        INSERT INTO {0} (coin, message_sid, link, post_time)
+        (SELECT DISTINCT ON (c.name)
+            c.name, s.sid, s.link, s.post_time
+        FROM {1} s
+        JOIN {2} c
+            ON s.content_tsv @@ phraseto_tsquery('english', c.name)
+        ORDER BY c.name, s.post_time DESC)
+        ON CONFLICT (coin) DO UPDATE
+        SET message_sid = EXCLUDED.message_sid,
+            link = EXCLUDED.link,
+            post_time = EXCLUDED.post_time,
+            db_update_time = current_timestamp
+        WHERE {0}.post_time IS NULL
+            OR {0}.post_time <= EXCLUDED.post_time""".format(
+        tables['coin_latest_mention'], stagingTable, tables['coin']))
+
+
 def insertBoard(datum):
     """Load a single board."""
     _insertSingle(datum, 'board')
@@ -179,6 +213,7 @@ def _selectBatch(dataIds, tableLabel):
     else:
         for datum in rows:
             del datum['db_update_time']
+            datum.pop('content_tsv', None)
             datum['id'] = datum.pop('sid')
         return rows
 
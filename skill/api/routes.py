@@ -2,13 +2,21 @@
 Creates public API methods. 
 """
 import os
+import asyncio
 import requests
 
+from functools import partial
+from psycopg2.pool import PoolError
+from concurrent.futures import ThreadPoolExecutor
+
 from skill import Crypto
+from skill.storage import Storage
+from skill.artifacts import read_manifest
 from skill.metadata import (__version__, __release_date__, __skill_name__, 
                             __skill_description__)
 
 from sanic import response
+from sanic.log import logger
 from sanic.response import json
 
 
@@ -28,6 +36,54 @@ def create_routes(app):
         added.
 
     """
+    @app.listener('before_server_start')
+    async def init_pool(app, loop):
+        """
+        Creates the database connection pool
+        of this worker.
+        """
+        Storage.create_pool()
+
+    @app.listener('after_server_stop')
+    async def close_pool(app, loop):
+        """
+        Closes the database connection pool
+        of this worker.
+        """
+        Storage.close_pool()
+
+    @app.listener('before_server_start')
+    async def init_executor(app, loop):
+        """
+        Creates the bounded thread pool used for running
+        blocking calls (e.g. database queries) outside
+        of the event loop.
+        """
+        threads = int(os.getenv('EXECUTOR_THREADS', 8))
+        app.executor = ThreadPoolExecutor(max_workers=threads)
+        app.executor_stats = {'threads': threads, 'submitted': 0, 'completed': 0}
+
+    @app.listener('after_server_stop')
+    async def close_executor(app, loop):
+        """
+        Shuts down the thread pool of this worker.
+        """
+        app.executor.shutdown(wait=False)
+
+    async def run_blocking(function, *args, **kwargs):
+        """
+        Runs a blocking function in the thread pool
+        of the worker, so that the event loop keeps
+        serving other requests in the meantime.
+        """
+        loop = asyncio.get_event_loop()
+        app.executor_stats['submitted'] += 1
+        try:
+            return await loop.run_in_executor(
+                app.executor, partial(function, *args, **kwargs))
+        finally:
+            app.executor_stats['completed'] += 1
+
     @app.listener('before_server_start')
     async def init_skill(app, loop):
         """
@@ -36,6 +92,78 @@ def create_routes(app):
         """
         app.skill = Crypto()
         
+    async def watch_manifest(app, directory, interval):
+        """
+        Watches the manifest written by the training job,
+        and loads every newly published model.
+        """
+        current = read_manifest(directory)
+        while True:
+            await asyncio.sleep(interval)
+
+            manifest = read_manifest(directory)
+            if not manifest or manifest == current:
+                continue
+
+            model_path = os.path.join(directory, manifest['model'])
+            logger.info(f'New model published: {model_path}')
+            try:
+                await run_blocking(
+                    app.skill.model_setting, model_path=model_path, original=False)
+                current = manifest
+            except Exception as e:
+                logger.error(f'Could not load {model_path}: {e}')
+
+    @app.listener('after_server_start')
+    async def start_manifest_watcher(app, loop):
+        """
+        Starts watching for models published
+        by the training job.
+        """
+        directory = os.getenv('MODELS_PATH')
+        if directory:
+            interval = float(os.getenv('MANIFEST_POLL_INTERVAL', 30))
+            app.manifest_watcher = loop.create_task(
+                watch_manifest(app, directory, interval))
+
+    @app.listener('before_server_stop')
+    async def stop_manifest_watcher(app, loop):
+        """
+        Stops watching for published models.
+        """
+        watcher = getattr(app, 'manifest_watcher', None)
+        if watcher:
+            watcher.cancel()
+
+    async def refresh_catalog(app, interval):
+        """
+        Periodically refreshes the coin catalog
+        of the skill from the latest listings.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await run_blocking(app.skill.refresh_catalog)
+            except Exception as e:
+                logger.error(f'Could not refresh coin catalog: {e}')
+
+    @app.listener('after_server_start')
+    async def start_catalog_refresh(app, loop):
+        """
+        Starts refreshing the coin catalog.
+        """
+        interval = float(os.getenv('CATALOG_REFRESH_INTERVAL', 60 * 60))
+        app.catalog_refresh = loop.create_task(refresh_catalog(app, interval))
+
+    @app.listener('before_server_stop')
+    async def stop_catalog_refresh(app, loop):
+        """
+        Stops refreshing the coin catalog.
+        """
+        task = getattr(app, 'catalog_refresh', None)
+        if task:
+            task.cancel()
+
     @app.route('/')
     @app.route('/status')
     async def index(request):
@@ -51,18 +179,57 @@ def create_routes(app):
         }
         return json(r)
 
+    @app.route('/stats')
+    async def stats(request):
+        """
+        Returns runtime statistics of this worker.
+        """
+        pending = app.executor_stats['submitted'] - app.executor_stats['completed']
+        r = {
+            'success': True,
+            'pool': Storage.pool_stats(),
+            'models': app.skill.models.stats(),
+            'executor': {
+                'threads': app.executor_stats['threads'],
+                'pending': pending,
+                'queued': max(0, pending - app.executor_stats['threads'])
+            }
+        }
+        return json(r)
+
     @app.route('/update')
     async def update(request):
         """
-        Returns the status of the API.
+        Loads the latest model in the background. Requests
+        keep being served by the current model until the
+        new one is loaded and swapped in.
         """
-        model,model_path,comparison_results = Crypto().model_setting(model_path=None,original=False)
-        app.skill.model = model
-        app.skill.model_path = model_path
-        app.skill.comparison_results = comparison_results
+        if getattr(app, 'model_update', None):
+            r = {
+                'success': False,
+                'message': 'A model update is already running.'
+            }
+            return json(r, status=409)
+
+        def finish_update(future):
+            """
+            Logs the outcome of the model update and
+            allows the next one to start.
+            """
+            app.model_update = None
+            if future.cancelled():
+                logger.warning('Model update was cancelled.')
+            elif future.exception():
+                logger.error(f'Model update failed: {future.exception()!r}')
+            else:
+                logger.info(f'Model updated: {app.skill.model_path}')
+
+        app.model_update = asyncio.ensure_future(
+            run_blocking(app.skill.model_setting, model_path=None, original=False))
+        app.model_update.add_done_callback(finish_update)
         r = {
             'success': True, 
-            'message': f"Model updated successfully. New Model: {app.skill.model}"
+            'message': f"Model update started. Current Model: {app.skill.model_path}"
         }
         return json(r)
     
@@ -80,6 +247,10 @@ def create_routes(app):
         limit: int 
             Limits the amount of different cryptocurrencies to be found. Default is 3.
 
+        week: str
+            ISO week (e.g. '2018W32') of the model used for
+            related coins. Default is the current model.
+
         Returns
         -------
         JSON with the summarization results. Results also
@@ -107,6 +278,7 @@ def create_routes(app):
         else:
             text = request.json.get('text')
             limit = request.json.get('limit', 3)
+            week = request.json.get('week')
             if not text:
                 success = False
                 results = []
@@ -115,13 +287,19 @@ def create_routes(app):
 
             else:
                 try:
-                    results = app.skill.text(text=text, limit=limit)
+                    results = await run_blocking(
+                        app.skill.text, text=text, limit=limit, week=week)
                     message = 'Searched `text` data successfully.'
                     success = True
                 except (ValueError, KeyError) as e:
                     status = 400
                     results = []
-                    message = e
+                    message = str(e)
+                    success = False
+                except PoolError as e:
+                    status = 503
+                    results = []
+                    message = f'Database is busy. Try again later. {e}'
                     success = False
 
         payload = {
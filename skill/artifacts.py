@@ -0,0 +1,177 @@
+"""
+Logic for publishing trained models and their
+companion files atomically, with a manifest.
+"""
+import os
+import glob
+import json
+import hashlib
+import tempfile
+
+from datetime import datetime
+
+MANIFEST = 'manifest.json'
+
+
+def checksum(path, block_size=2**20):
+    """
+    SHA-256 checksum of a file.
+
+    Parameters
+    ----------
+    path: str
+        Path to file.
+
+    block_size: int, default 1048576
+        Number of bytes read at a time.
+
+    Returns
+    -------
+    str
+        Checksum as `sha256:<hex digest>`.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return f'sha256:{digest.hexdigest()}'
+
+
+def vectors_path(model_path):
+    """
+    Path of the serving artifact saved next to
+    a model file. It holds the KeyedVectors only,
+    with their arrays in a separate `.npy` file
+    that can be memory-mapped.
+
+    Parameters
+    ----------
+    model_path: str
+        Path to a model file (e.g. `models/2018W32.model`).
+
+    Returns
+    -------
+    str
+        Path to the serving artifact
+        (e.g. `models/2018W32.kv`).
+    """
+    root, _ = os.path.splitext(model_path)
+    return root + '.kv'
+
+
+def staging_directory(directory):
+    """
+    Creates a temporary directory for writing artifacts
+    before they are published. It lives inside `directory`
+    so that files can be moved from it with atomic renames.
+
+    Parameters
+    ----------
+    directory: str
+        Directory where artifacts are published.
+
+    Returns
+    -------
+    str
+        Path to the staging directory.
+    """
+    os.makedirs(directory, exist_ok=True)
+    return tempfile.mkdtemp(prefix='.staging-', dir=directory)
+
+
+def publish(staging, directory, manifest):
+    """
+    Publishes a staging directory by atomically renaming
+    it to a new version directory inside `directory`, and
+    then atomically replaces the manifest. Files of earlier
+    versions are never overwritten, so readers that follow
+    the manifest never see a partially published set.
+
+    Parameters
+    ----------
+    staging: str
+        Staging directory from staging_directory().
+
+    directory: str
+        Directory where artifacts are published.
+
+    manifest: dict
+        Manifest contents. Values that name a staged
+        file are made relative to `directory`, the list
+        of published files is added under the `files`
+        key and the version under the `version` key.
+
+    Returns
+    -------
+    dict
+        Manifest as written.
+    """
+    names = sorted(os.listdir(staging))
+    version = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+
+    #
+    #  mkdtemp() creates the staging directory
+    #  readable by its owner only.
+    #
+    os.chmod(staging, 0o755)
+    os.rename(staging, os.path.join(directory, version))
+
+    manifest = {
+        key: os.path.join(version, value)
+        if isinstance(value, str) and value in names else value
+        for key, value in manifest.items()
+    }
+    manifest.update(version=version,
+                    files=[os.path.join(version, name) for name in names],
+                    published=datetime.utcnow().isoformat())
+    descriptor, path = tempfile.mkstemp(prefix='.manifest-', dir=directory)
+    with os.fdopen(descriptor, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(path, os.path.join(directory, MANIFEST))
+
+    return manifest
+
+
+def published_path(directory, name):
+    """
+    Path of the most recently published file with
+    a given name, such as the model of a week.
+
+    Parameters
+    ----------
+    directory: str
+        Directory where artifacts are published.
+
+    name: str
+        File name (e.g. `2018W32.model`).
+
+    Returns
+    -------
+    str
+        Path to the file in the latest version that
+        has it, or else directly inside `directory`.
+    """
+    versions = sorted(glob.glob(os.path.join(directory, '[0-9]*T*', name)))
+    return versions[-1] if versions else os.path.join(directory, name)
+
+
+def read_manifest(directory):
+    """
+    Reads the manifest of a directory.
+
+    Parameters
+    ----------
+    directory: str
+        Directory where artifacts are published.
+
+    Returns
+    -------
+    dict
+        Manifest contents, or None if the
+        directory has no manifest.
+    """
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
@@ -29,7 +29,7 @@ class BitcoinTalk:
         self.monday_last_week = str((Week.thisweek() - 1).monday())
         self.sunday_last_week = str((Week.thisweek() - 1).sunday())
 
-    def __start_to_end_date(self, start, stop):
+    def __start_to_end_date(self, start, stop, size):
         """
         Fetches all BitcoinTalk data from within
         a specified time period.
@@ -39,52 +39,75 @@ class BitcoinTalk:
         start, stop: str
             Date strings in ISO format.
 
+        size: int
+            Number of rows fetched from the
+            database at a time.
+
         Returns
         -------
-        result: list
-            List of messages from database.
+        result: generator
+            Generator of messages from database.
         """
-        with Storage(self.uri) as S:
-            sql = f"""
+        with Storage(self.uri, pool=True) as S:
+            sql = """
                 SELECT 
+                    sid,
                     subject,
                     content_no_quote_no_html 
                 FROM message 
-                WHERE post_time > '{start}' AND 
-                      post_time <= '{stop}'
+                WHERE post_time > %s AND 
+                      post_time <= %s
             """
-            result = S.execute(sql)
-
-        return result
+            yield from S.iterate(sql, [start, stop], size=size)
 
-    def last_week(self):
+    def last_week(self, size=int(os.getenv('FETCH_SIZE', 2000))):
         """
         Fetches last week's data from the database.
         A week is defined as seven days prior to current day.
 
+        Parameters
+        ----------
+        size: int, default 2000
+            Number of rows fetched from the
+            database at a time.
+
         Returns
         -------
-        list
-            List of records from database.
+        generator
+            Generator of records from database.
         """
         return self.__start_to_end_date(self.monday_last_week,
-                                        self.sunday_last_week)
+                                        self.sunday_last_week,
+                                        size)
 
-    def all(self):
+    def all(self, size=int(os.getenv('FETCH_SIZE', 2000))):
         """
         Fetches all records from database.
+
+        Parameters
+        ----------
+        size: int, default 2000
+            Number of rows fetched from the
+            database at a time.
         
         Returns
         -------
-        result: list
-            Records from database.
+        result: generator
+            Generator of records from database.
         """
-        with Storage(self.uri) as S:
-            result = S.execute("SELECT * FROM message")
-
-        return result
+        with Storage(self.uri, pool=True) as S:
+            sql = """
+                SELECT
+                    sid,
+                    subject,
+                    link,
+                    post_time,
+                    content_no_quote_no_html
+                FROM message
+            """
+            yield from S.iterate(sql, size=size)
 
-    def sample(self, sample_size=0.01):
+    def sample(self, sample_size=0.01, size=int(os.getenv('FETCH_SIZE', 2000))):
         """
         Get a random sample from the database using PostgreSQL's
         random sampling features (SYSTEM method). Refer to
@@ -96,58 +119,365 @@ class BitcoinTalk:
         ----------
         sample_size: float
             Share of records to return. 
+
+        size: int, default 2000
+            Number of rows fetched from the
+            database at a time.
         
         Returns
         -------
-        result: list
-            Results from database.
+        result: generator
+            Generator of results from database.
 
         """
-        with Storage(self.uri) as S:
-            sql = f"""
+        with Storage(self.uri, pool=True) as S:
+            sql = """
             SELECT
+                sid,
                 subject,
                 link,
                 content_no_quote_no_html
             FROM message
-            TABLESAMPLE SYSTEM('{sample_size}')
+            TABLESAMPLE SYSTEM(%s)
+            """
+            yield from S.iterate(sql, [sample_size], size=size)
+
+    def __window(self, start, stop):
+        """
+        SQL condition for messages posted
+        within a time period.
+
+        Parameters
+        ----------
+        start, stop: str
+            Date strings in ISO format. If either
+            is None, all messages are included.
+
+        Returns
+        -------
+        tuple
+            SQL condition and its values.
+        """
+        if start is None or stop is None:
+            return 'TRUE', []
+        return 'm.post_time > %s AND m.post_time <= %s', [start, stop]
+
+    def untokenized(self, version, start=None, stop=None,
+                    size=int(os.getenv('FETCH_SIZE', 2000))):
+        """
+        Fetches messages that have no tokenized sentences
+        for a preprocessing version, or whose tokens are
+        older than the message itself.
+
+        Parameters
+        ----------
+        version: int
+            Preprocessing version.
+
+        start, stop: str, default None
+            Date strings in ISO format. All messages
+            are included if either is None.
+
+        size: int, default 2000
+            Number of rows fetched from the
+            database at a time.
+
+        Returns
+        -------
+        result: generator
+            Generator of messages from database.
+        """
+        condition, values = self.__window(start, stop)
+        with Storage(self.uri, pool=True) as S:
+            sql = f"""
+                SELECT
+                    m.sid,
+                    m.content_no_quote_no_html
+                FROM message m
+                WHERE {condition} AND NOT EXISTS (
+                    SELECT 1
+                    FROM message_tokens t
+                    WHERE t.sid = m.sid AND
+                          t.version = %s AND
+                          t.db_update_time >= coalesce(m.db_update_time, '-infinity')
+                )
             """
-            result = S.execute(sql)
+            yield from S.iterate(sql, values + [version], size=size)
+
+    def tokenized(self, version, start=None, stop=None,
+                  size=int(os.getenv('FETCH_SIZE', 2000))):
+        """
+        Fetches tokenized sentences of messages.
+
+        Parameters
+        ----------
+        version: int
+            Preprocessing version.
+
+        start, stop: str, default None
+            Date strings in ISO format. All messages
+            are included if either is None.
+
+        size: int, default 2000
+            Number of rows fetched from the
+            database at a time.
+
+        Returns
+        -------
+        result: generator
+            Generator of strings with the sentences of
+            each message, one sentence per line.
+        """
+        condition, values = self.__window(start, stop)
+        with Storage(self.uri, pool=True) as S:
+            sql = f"""
+                SELECT
+                    t.sentences
+                FROM message_tokens t
+                JOIN message m ON m.sid = t.sid
+                WHERE {condition} AND t.version = %s
+            """
+            for row in S.iterate(sql, values + [version], size=size):
+                yield row['sentences']
+
+    def save_tokens(self, records, version):
+        """
+        Saves tokenized sentences of messages.
+
+        Parameters
+        ----------
+        records: list
+            List of (sid, sentences) tuples, with
+            one sentence per line in `sentences`.
+
+        version: int
+            Preprocessing version.
+
+        Returns
+        -------
+        int
+            Number of rows saved.
+        """
+        if not records:
+            return 0
+
+        sids = [sid for sid, _ in records]
+        sentences = [lines for _, lines in records]
+        with Storage(self.uri, pool=True) as S:
+            result = S.execute("""
+                INSERT INTO message_tokens (sid, version, sentences)
+                    SELECT sid, %s, sentences
+                    FROM unnest(%s::bigint[], %s::text[]) AS r(sid, sentences)
+                ON CONFLICT (sid, version) DO UPDATE
+                    SET sentences = EXCLUDED.sentences,
+                        db_update_time = current_timestamp
+                """, [version, sids, sentences])
 
         return result
 
-    @cached(max_age=60 * 60 * 12)
-    def latest_message(self,coin):
-        if isinstance(coin,list):
-            logger.info("Input is list!")
-            results = []
-            S = Storage(self.uri)
-            S.open()
-            for c in coin:
-                logger.info(f"Querying for {c}")
-                sql = f"""
+    def save_coins(self, coins):
+        """
+        Saves the catalog of coins searched by the skill.
+        The scraper uses it to keep the latest mention
+        of each coin up-to-date. Coins without a latest
+        mention get it searched once here.
+
+        Coins are only added or updated, never removed,
+        since every worker calls this method with its own
+        catalog. Coins that are no longer listed are
+        removed with prune_coins().
+
+        Parameters
+        ----------
+        coins: list
+            List of coin dictionaries from
+            CoinMarketCap.listings().
+
+        Returns
+        -------
+        int
+            Number of new coins whose latest
+            mention was searched.
+        """
+        catalog = {}
+        for coin in coins:
+            catalog.setdefault(coin['name'], coin)
+
+        names = list(catalog)
+        slugs = [coin['website_slug'] for coin in catalog.values()]
+        symbols = [coin['symbol'] for coin in catalog.values()]
+
+        with Storage(self.uri, pool=True) as S:
+            S.execute("""
+                INSERT INTO coin (name, slug, symbol)
+                    SELECT * FROM unnest(%s::text[], %s::text[], %s::text[])
+                ON CONFLICT (name) DO UPDATE
+                    SET slug = EXCLUDED.slug,
+                        symbol = EXCLUDED.symbol
+                """, [names, slugs, symbols])
+
+            #
+            #  Only coins of this catalog without a
+            #  latest mention are searched for.
+            #
+            result = S.execute("""
+                INSERT INTO coin_latest_mention (coin, message_sid, link, post_time)
                     SELECT
-                        link
-                    FROM message
-                    WHERE to_tsvector('english', content_no_quote_no_html) @@ to_tsquery('english', '{c}')
-                        ORDER BY post_time DESC
-                        LIMIT 1
-                    """
-                results.append(S.execute(sql)[0]['link'])
-                logger.info(f"Querying for {c} complete!")
-            S.close()
-            return results
-        
-        else:
-            with Storage(self.uri) as S:
-                sql = f"""
+                        c.name,
+                        latest.sid,
+                        latest.link,
+                        latest.post_time
+                    FROM (
+                        SELECT name FROM unnest(%s::text[]) AS c(name)
+                        EXCEPT
+                        SELECT coin FROM coin_latest_mention
+                    ) c
+                    LEFT JOIN LATERAL (
+                        SELECT
+                            sid,
+                            link,
+                            post_time
+                        FROM message
+                        WHERE content_tsv @@ phraseto_tsquery('english', c.name)
+                            ORDER BY post_time DESC
+                            LIMIT 1
+                    ) latest ON TRUE
+                ON CONFLICT (coin) DO NOTHING
+                """, [names])
+
+        return result
+
+    def prune_coins(self, coins):
+        """
+        Removes coins that are not in the catalog
+        anymore, together with their latest mention.
+        Meant to run once per listings refresh, from
+        the scheduler, with the full catalog.
+
+        Parameters
+        ----------
+        coins: list
+            List of coin dictionaries from
+            CoinMarketCap.listings().
+
+        Returns
+        -------
+        int
+            Number of coins removed.
+        """
+        names = list({coin['name'] for coin in coins})
+        if not names:
+            return 0
+
+        with Storage(self.uri, pool=True) as S:
+            S.execute("""
+                DELETE FROM coin_latest_mention WHERE NOT (coin = ANY(%s))
+                """, [names])
+            return S.execute("""
+                DELETE FROM coin WHERE NOT (name = ANY(%s))
+                """, [names])
+
+    def __search_latest_messages(self, coins):
+        """
+        Searches the message table for the latest
+        message that mentions each coin.
+
+        Parameters
+        ----------
+        coins: list
+            List of coin names.
+
+        Returns
+        -------
+        result: list
+            List of message links in the same order
+            as `coins`.
+        """
+        with Storage(self.uri, pool=True) as S:
+            sql = """
+                SELECT
+                    latest.link
+                FROM unnest(%s::text[]) WITH ORDINALITY AS c(coin, position)
+                LEFT JOIN LATERAL (
                     SELECT
                         link
                     FROM message
-                    WHERE to_tsvector('english', content_no_quote_no_html) @@ to_tsquery('english', '{coin}')
+                    WHERE content_tsv @@ phraseto_tsquery('english', c.coin)
                         ORDER BY post_time DESC
                         LIMIT 1
-                    """
-                result = S.execute(sql)
+                ) latest ON TRUE
+                ORDER BY c.position
+                """
+            result = S.execute(sql, [coins])
+
+        return [row['link'] for row in result]
+
+    @cached(max_age=60 * 60 * 12)
+    def latest_messages(self, coins):
+        """
+        Finds the link to the latest message that mentions
+        each coin in a list. Links are read from the latest
+        mentions kept by the scraper in a single query. Coins
+        that are not in that table yet are searched for in
+        the messages themselves. Coin names are passed as
+        query parameters (e.g. 'Bitcoin Cash' is searched
+        as a phrase).
+
+        Parameters
+        ----------
+        coins: list
+            List of coin names.
+
+        Returns
+        -------
+        result: list
+            List of message links in the same order
+            as `coins`. Coins without any message
+            have a None link.
+        """
+        coins = list(coins)
+        if not coins:
+            return []
+
+        logger.info(f"Querying latest messages for {len(coins)} coin(s)")
+        with Storage(self.uri, pool=True) as S:
+            sql = """
+                SELECT
+                    m.coin IS NOT NULL AS indexed,
+                    m.link
+                FROM unnest(%s::text[]) WITH ORDINALITY AS c(coin, position)
+                LEFT JOIN coin_latest_mention m ON m.coin = c.coin
+                ORDER BY c.position
+                """
+            rows = S.execute(sql, [coins])
+
+        result = [row['link'] for row in rows]
+        missing = [i for i, row in enumerate(rows) if not row['indexed']]
+        if missing:
+            logger.info(f"Searching messages for {len(missing)} unindexed coin(s)")
+            links = self.__search_latest_messages([coins[i] for i in missing])
+            for i, link in zip(missing, links):
+                result[i] = link
+
+        return result
+
+    def latest_message(self, coin):
+        """
+        Finds the link to the latest message that
+        mentions a coin, or a list of coins.
+
+        Parameters
+        ----------
+        coin: str or list
+            Coin name or list of coin names.
+
+        Returns
+        -------
+        str or list
+            Message link, or list of message links
+            if a list was passed.
+        """
+        if isinstance(coin, list):
+            return self.latest_messages(coin)
 
-            return result[0]['link']
+        return self.latest_messages([coin])[0]
@@ -0,0 +1,135 @@
+"""
+Bounded cache of weekly models, evicting the least
+recently used ones to stay within a memory budget.
+"""
+import os
+import sys
+import threading
+
+from collections import OrderedDict
+
+
+def estimate_size(state):
+    """
+    Estimates the memory used by a model state: its
+    related coins table and, if loaded, its vectors.
+
+    Parameters
+    ----------
+    state: ModelState
+        State to measure.
+
+    Returns
+    -------
+    int
+        Size in bytes.
+    """
+    size = sys.getsizeof(state.comparison_results or {})
+    for key, related in (state.comparison_results or {}).items():
+        size += sys.getsizeof(key) + sys.getsizeof(related)
+        for coin in related:
+            size += sys.getsizeof(coin)
+            size += sum(sys.getsizeof(value) for value in coin.values())
+
+    model = state._model
+    if model is not None:
+        vectors = getattr(getattr(model, 'wv', model), 'vectors', None)
+        size += getattr(vectors, 'nbytes', 0)
+
+    return size
+
+
+class ModelCache:
+    """
+    Least recently used cache of model states keyed
+    by ISO week. States are evicted, oldest access
+    first, while the cache is over its memory budget.
+    The most recently added state is always kept, even
+    if it is larger than the budget on its own.
+
+    Parameters
+    ----------
+    loader: function
+        Function that loads the state of a week.
+        Called when the week is not in the cache.
+
+    budget: int, default MODEL_CACHE_BYTES or 268435456
+        Memory budget in bytes.
+    """
+    def __init__(self, loader,
+                 budget=int(os.getenv('MODEL_CACHE_BYTES', 256 * 2**20))):
+        self.loader = loader
+        self.budget = budget
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, week):
+        """
+        Gets the state of a week, loading it
+        if it is not in the cache.
+
+        Parameters
+        ----------
+        week: str
+            ISO week (e.g. '2018W32').
+
+        Returns
+        -------
+        ModelState
+        """
+        with self.lock:
+            if week in self.entries:
+                self.entries.move_to_end(week)
+                self.hits += 1
+                return self.entries[week]
+            self.misses += 1
+
+        #
+        #  Loading happens outside of the lock so that
+        #  cached weeks are served in the meantime.
+        #
+        state = self.loader(week)
+        size = estimate_size(state)
+
+        with self.lock:
+            self.entries[week] = state
+            self.entries.move_to_end(week)
+            self.sizes[week] = size
+            while len(self.entries) > 1 and self.nbytes > self.budget:
+                evicted, _ = self.entries.popitem(last=False)
+                del self.sizes[evicted]
+                self.evictions += 1
+
+        return state
+
+    @property
+    def nbytes(self):
+        """
+        Estimated size of all cached states in bytes.
+        """
+        return sum(self.sizes.values())
+
+    def stats(self):
+        """
+        Statistics of the cache.
+
+        Returns
+        -------
+        dict
+            Cached weeks, their estimated size and
+            budget in bytes, and the number of hits,
+            misses and evictions.
+        """
+        with self.lock:
+            return {
+                'weeks': list(self.entries),
+                'bytes': self.nbytes,
+                'budget': self.budget,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
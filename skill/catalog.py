@@ -0,0 +1,217 @@
+"""
+Logic for building the catalog of coins
+that the skill searches for.
+"""
+import os
+import json
+import tempfile
+
+UNDESIRABLE_COINS = ['Crypto', 'ICOS', 'Naviaddress', 'B2BX']
+LEXICON_VERSION = 1
+
+
+class CoinIndex:
+    """
+    Dictionary indexes over a list of coins, for
+    constant time lookups by id, slug, lower-cased
+    name and symbol, and of the position (rank) of
+    every coin id in the list. Built once per list
+    of coins.
+
+    Parameters
+    ----------
+    coins: list
+        List of coin dictionaries from
+        CoinMarketCap.listings().
+    """
+    def __init__(self, coins):
+        self.coins = coins
+        self.by_id = {}
+        self.ranks = {}
+        self.by_slug = {}
+        self.by_name = {}
+        self.by_symbol = {}
+
+        #
+        #  The first coin wins when names or slugs
+        #  are repeated, as with a linear search.
+        #  Symbols are not unique, so all coins
+        #  sharing one are kept.
+        #
+        for i, coin in enumerate(coins):
+            self.by_id.setdefault(coin['id'], coin)
+            self.ranks.setdefault(coin['id'], i)
+            self.by_slug.setdefault(coin['website_slug'], coin)
+            self.by_name.setdefault(coin['name'].lower(), coin)
+            self.by_symbol.setdefault(coin['symbol'], []).append(coin)
+
+    def find(self, coin):
+        """
+        Finds a coin by id or slug.
+
+        Parameters
+        ----------
+        coin: str or int
+            Coin ID (e.g. 1) or slug (e.g. 'bitcoin').
+
+        Returns
+        -------
+        dict
+            Coin dictionary, or None if
+            there is no such coin.
+        """
+        if isinstance(coin, int):
+            return self.by_id.get(coin)
+        return self.by_slug.get(coin)
+
+    def __len__(self):
+        return len(self.coins)
+
+
+def ambiguous_names(names):
+    """
+    Finds which names have a definition in WordNet,
+    i.e. are ordinary English words. NLTK is only
+    imported here, so that processes reading an
+    up-to-date lexicon never load WordNet.
+
+    Parameters
+    ----------
+    names: list
+        Coin names to look up.
+
+    Returns
+    -------
+    list
+        Names with at least one WordNet synset.
+    """
+    from nltk.corpus import wordnet as wn
+    return [name for name in names if wn.synsets(name)]
+
+
+def load_lexicon(path):
+    """
+    Reads a lexicon written by save_lexicon().
+
+    Parameters
+    ----------
+    path: str
+        Path to the lexicon.
+
+    Returns
+    -------
+    dict
+        Lexicon with the `checked`, `ambiguous` and
+        `undesirable` names as sets, or None if the
+        file is missing or from another version.
+    """
+    try:
+        with open(path) as f:
+            lexicon = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if lexicon.get('version') != LEXICON_VERSION:
+        return None
+
+    return {
+        key: set(lexicon[key])
+        for key in ['checked', 'ambiguous', 'undesirable']
+    }
+
+
+def save_lexicon(path, lexicon):
+    """
+    Writes a lexicon as JSON, replacing
+    the previous file atomically.
+
+    Parameters
+    ----------
+    path: str
+        Path to write the lexicon to.
+
+    lexicon: dict
+        Dictionary with the `checked`, `ambiguous`
+        and `undesirable` sets of names.
+    """
+    contents = {key: sorted(names) for key, names in lexicon.items()}
+    contents['version'] = LEXICON_VERSION
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(prefix='.lexicon-', dir=directory)
+    with os.fdopen(descriptor, 'w') as f:
+        json.dump(contents, f, separators=(',', ':'))
+    os.replace(temporary, path)
+
+
+def update_lexicon(names, path):
+    """
+    Loads the lexicon, and updates it when the listings
+    contain names that were never looked up in WordNet
+    or the list of undesirable coins has changed. Only
+    the new names are looked up.
+
+    Parameters
+    ----------
+    names: list
+        Names of all listed coins.
+
+    path: str
+        Path to the lexicon.
+
+    Returns
+    -------
+    dict
+        Up-to-date lexicon.
+    """
+    lexicon = load_lexicon(path) or {
+        'checked': set(),
+        'ambiguous': set(),
+        'undesirable': set()
+    }
+
+    missing = set(names) - lexicon['checked']
+    undesirable = set(UNDESIRABLE_COINS)
+    if not missing and lexicon['undesirable'] == undesirable:
+        return lexicon
+
+    lexicon['checked'] |= missing
+    lexicon['ambiguous'] |= set(ambiguous_names(sorted(missing)))
+    lexicon['undesirable'] = undesirable
+    save_lexicon(path, lexicon)
+
+    return lexicon
+
+
+def filter_listings(coins,
+                    lexicon_path=os.getenv('LEXICON_PATH', os.path.join(
+                        os.getenv('MODELS_PATH') or 'models', 'lexicon.json'))):
+    """
+    Restricts currencies to only currencies without a
+    definition in WordNet, and removes coins that are
+    known to produce false positives.
+
+    WordNet lookups are stored in a lexicon file, so
+    they are only made for names that were not listed
+    before.
+
+    Parameters
+    ----------
+    coins: list
+        List of coin dictionaries from
+        CoinMarketCap.listings().
+
+    lexicon_path: str, default LEXICON_PATH or 'models/lexicon.json'
+        Path to the lexicon file.
+
+    Returns
+    -------
+    list
+        New list with the coins that are kept.
+        The input list is not modified.
+    """
+    lexicon = update_lexicon([coin['name'] for coin in coins], lexicon_path)
+    excluded = lexicon['ambiguous'] | lexicon['undesirable']
+
+    return [coin for coin in coins if coin['name'] not in excluded]
@@ -2,17 +2,23 @@
 Logic for collecting data directly from the 
 CoinMarketCap API.
 """
+import psycopg2
 import requests
 import pandas as pd
 
 from memoize import Memoizer
 from bs4 import BeautifulSoup
 from functools import lru_cache
+from sanic.log import logger
 from datetime import datetime, timedelta
+from skill.catalog import CoinIndex
+from skill.prices import PriceHistory
 
 store = {}
 cached = Memoizer(store)
 
+_index = None
+
 
 class CoinMarketCap:
     """
@@ -59,12 +65,8 @@ class CoinMarketCap:
             its slug. Example:
                 { 'id': 1, 'slug': 'bitcoin' }
         """
-        try:
-            if isinstance(coin, int):
-                match = next((c for c in self.listings() if c['id'] == coin))
-            elif isinstance(coin, str):
-                match = next((c for c in self.listings() if c['website_slug'] == coin))
-        except StopIteration:
+        match = self.index().find(coin)
+        if match is None:
             raise ValueError(f'Coin `{coin}` does not exist.')
 
         result = {
@@ -92,7 +94,6 @@ class CoinMarketCap:
         return response.ok
 
     @property
-    @cached(max_age=60*60*24)
     def coin_ids(self):
         """
         Property that represents an interable of 
@@ -104,10 +105,9 @@ class CoinMarketCap:
         list
             List of strings representing coin IDs.
         """
-        return [c['id'] for c in self.listings()]
+        return list(self.index().by_id)
     
     @property
-    @cached(max_age=60*60*24)
     def coin_slugs(self):
         """
         Property that represents an interable of "slugs"
@@ -120,7 +120,7 @@ class CoinMarketCap:
             List of strings representing coin "slugs".
 
         """
-        return [c['website_slug'] for c in self.listings()]
+        return list(self.index().by_slug)
 
     @classmethod
     @cached(max_age=60*60*5)
@@ -129,7 +129,12 @@ class CoinMarketCap:
                  stop=datetime.now().strftime('%Y%m%d')):
         """
         Retrieves historic data within a time
-        period.
+        period. Data is read from the local price
+        history, which is first completed with the days
+        it is missing for the coin. Those are the only
+        days scraped from CoinMarketCap. If that fails,
+        the stored days are returned. If the database
+        fails, the whole period is scraped instead.
 
         Parameters
         ----------
@@ -138,8 +143,8 @@ class CoinMarketCap:
             or coin ID (e.g. 1).
 
         start, stop: str
-            Start and stop dates in ISO format (YYYY-MM-DD).
-            Start's default is now - 90 days.
+            Start and stop dates in ISO format (YYYY-MM-DD
+            or YYYYMMDD). Start's default is now - 90 days.
 
         Returns
         -------
@@ -148,20 +153,119 @@ class CoinMarketCap:
             scraped from CoinMarketCap.
         """
         ticker = cls.__find_coin(cls, ticker)
+        slug = ticker['website_slug']
+
+        start = datetime.strptime(start.replace('-', ''), '%Y%m%d').date()
+        stop = datetime.strptime(stop.replace('-', ''), '%Y%m%d').date()
+
+        #
+        #  Any database error, while reading or while
+        #  storing scraped days, degrades to scraping
+        #  the whole period.
+        #
+        history = PriceHistory()
+        try:
+            cls.__fill_history(history, slug, start, stop)
+            return history.read(slug, start, stop)
+        except psycopg2.Error as e:
+            logger.warning(f'Price history unavailable, scraping {slug}: {e}')
+            return cls.__scrape_historic(slug, start, stop)
+
+    @classmethod
+    def __fill_history(cls, history, slug, start, stop):
+        """
+        Scrapes and stores the days of a period that
+        are missing from the price history of a coin.
+        Days that cannot be scraped are left missing.
+
+        Parameters
+        ----------
+        history: PriceHistory
+            Price history to complete.
+
+        slug: str
+            Coin slug (e.g. `bitcoin`).
+
+        start, stop: datetime.date
+            Start and stop dates.
+        """
+        #
+        #  CoinMarketCap publishes a day once it is
+        #  over, so the history is complete when it
+        #  reaches yesterday (or `stop`, if earlier).
+        #
+        first, last = history.bounds(slug)
+        complete = min(stop, datetime.now().date() - timedelta(days=1))
+        missing = []
+        if first is None:
+            missing.append((start, stop))
+        else:
+            if start < first:
+                missing.append((start, first - timedelta(days=1)))
+            if last < complete:
+                missing.append((last + timedelta(days=1), stop))
+
+        #
+        #  Checked days are recorded even without prices
+        #  (e.g. before a coin was listed), so they are
+        #  not scraped again. Days after `complete` may
+        #  still be published and are left unchecked.
+        #
+        for missing_start, missing_stop in missing:
+            try:
+                records = cls.__scrape_historic(slug, missing_start, missing_stop)
+            except (requests.RequestException, IndexError, ValueError) as e:
+                logger.warning(f'Could not fetch prices for {slug}: {e}')
+                continue
+
+            history.save(slug, records)
+            if missing_start <= complete:
+                history.cover(slug, missing_start, min(missing_stop, complete))
 
-        url = f"https://coinmarketcap.com/currencies/{ticker['website_slug']}/historical-data/?start={start}&end={stop}"
+    @classmethod
+    def __scrape_historic(cls, slug, start, stop):
+        """
+        Scrapes historic data within a time
+        period from CoinMarketCap.
+
+        Parameters
+        ----------
+        slug: str
+            Coin slug (e.g. `bitcoin`).
+
+        start, stop: datetime.date
+            Start and stop dates.
+
+        Returns
+        -------
+        list
+            List of dictionaries in the format
+            returned by historic().
+        """
+        url = f"https://coinmarketcap.com/currencies/{slug}/historical-data/?start={start:%Y%m%d}&end={stop:%Y%m%d}"
         r = requests.get(url)
 
         soup = BeautifulSoup(r.content, 'lxml')
         table = soup.find_all('table')[0]
+
+        #
+        #  Periods without prices are shown as a
+        #  single cell spanning the whole table.
+        #
+        rows = [row for row in table.find_all('tr') if len(row.find_all('td')) > 1]
+        if not rows:
+            return []
+
         df = pd.read_html(str(table))[0]
 
         #
         #  Cleans variables from the original.
         #
-        df['Date'] = df['Date'].apply(lambda x: datetime.strptime(x, '%b %d, %Y').strftime('%Y-%m-%d'))
-        df['Volume'] = df['Volume'].apply(lambda x: None if x == '-' else x)
         df.columns = ['date', 'open', 'high', 'low', 'close', 'volume', 'market_cap']
+        df['date'] = pd.to_datetime(df['date'], format='%b %d, %Y').dt.strftime('%Y-%m-%d')
+        df['volume'] = pd.to_numeric(df['volume'], errors='coerce')
+        df['market_cap'] = pd.to_numeric(df['market_cap'], errors='coerce')
+        df = df.astype(object).where(df.notnull(), None)
 
         #
         #  Ordering dates in ascending order.
@@ -193,6 +297,26 @@ class CoinMarketCap:
 
         return response.json()['data']
 
+    @classmethod
+    def index(cls):
+        """
+        Indexes of the listings by id, slug, lower-cased
+        name and symbol. They are built once every time
+        the cached listings are refreshed, and shared by
+        all instances.
+
+        Returns
+        -------
+        CoinIndex
+        """
+        global _index
+
+        listings = cls.listings()
+        if _index is None or _index.coins is not listings:
+            _index = CoinIndex(listings)
+
+        return _index
+
     @classmethod
     @cached(max_age=60*60*24)
     def current(cls, ticker):
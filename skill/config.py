@@ -0,0 +1,186 @@
+"""
+Configuration of the word2vec training.
+"""
+import os
+import json
+
+
+def available_cores():
+    """
+    Number of CPU cores available to this process.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class TrainingConfig:
+    """
+    Settings for training Word2Vec models. Values are read,
+    in order of precedence, from environment variables named
+    after each setting with a `W2V_` prefix (e.g. `W2V_EPOCHS`),
+    from a JSON file (path in `W2V_CONFIG`), and from the
+    defaults below.
+
+    Parameters
+    ----------
+    workers: int, default number of available cores
+        Number of threads used by gensim.
+
+    epochs: int, default 4000
+        Maximum number of epochs to train for.
+
+    size: int, default 100
+        Dimensionality of the word vectors.
+
+    window: int, default 5
+        Maximum distance between a word and
+        the words used to predict it.
+
+    min_count: int, default 5
+        Words with fewer occurrences are ignored.
+
+    negative: int, default 5
+        Number of negative samples.
+
+    max_vocab_size: int, default None
+        Limits the memory used while building the
+        vocabulary. None means no limit.
+
+    evaluate_every: int, default 10
+        Number of epochs between evaluations of the
+        coin similarity score. A value larger than
+        `epochs` disables early stopping.
+
+    patience: int, default 5
+        Number of evaluations without improvement
+        after which training stops.
+
+    min_delta: float, default 0.001
+        Minimum score increase that counts
+        as an improvement.
+
+    evaluation_pairs: list, default EVALUATION_PAIRS
+        Pairs of lower-cased coin names that are known
+        to be related. The coin similarity score is the
+        mean similarity of the pairs found in the
+        vocabulary. These names are also trained on, so
+        the score tracks convergence, not generalisation.
+
+    **word2vec_settings:
+        Any other setting is passed as is to
+        gensim.models.Word2Vec() (e.g. `sg`, `hs`
+        or `seed`).
+    """
+    EVALUATION_PAIRS = [
+        ['bitcoin', 'litecoin'],
+        ['ethereum', 'litecoin'],
+        ['monero', 'zcash'],
+        ['dogecoin', 'litecoin']
+    ]
+
+    DEFAULTS = {
+        'workers': available_cores(),
+        'epochs': 4000,
+        'size': 100,
+        'window': 5,
+        'min_count': 5,
+        'negative': 5,
+        'max_vocab_size': None,
+        'evaluate_every': 10,
+        'patience': 5,
+        'min_delta': 0.001,
+        'evaluation_pairs': EVALUATION_PAIRS
+    }
+
+    #
+    #  Settings that are passed directly
+    #  to gensim.models.Word2Vec().
+    #
+    WORD2VEC_SETTINGS = [
+        'workers', 'size', 'window', 'min_count', 'negative', 'max_vocab_size'
+    ]
+
+    #
+    #  Known settings that must be positive or
+    #  non-negative integers, and gensim settings
+    #  that would start training in the constructor,
+    #  which is driven by Model._fit() instead.
+    #
+    POSITIVE = ['workers', 'epochs', 'size', 'evaluate_every', 'patience']
+    COUNTS = ['window', 'min_count', 'negative']
+    RESERVED = ['sentences', 'corpus_file']
+
+    def __init__(self, **settings):
+        reserved = set(settings) & set(self.RESERVED)
+        if reserved:
+            raise ValueError(f'Settings not allowed: {sorted(reserved)}')
+
+        for key in self.POSITIVE + self.COUNTS:
+            value = settings.get(key, self.DEFAULTS[key])
+            minimum = 1 if key in self.POSITIVE else 0
+            if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+                raise ValueError(f'`{key}` must be an integer of at least {minimum}, not {value!r}.')
+
+        for key, value in self.DEFAULTS.items():
+            setattr(self, key, settings.get(key, value))
+
+        self.extra = {
+            key: value for key, value in settings.items()
+            if key not in self.DEFAULTS
+        }
+
+    def __repr__(self):
+        return f'TrainingConfig({self.as_dict()})'
+
+    def as_dict(self):
+        """
+        Dictionary with all settings.
+        """
+        settings = {key: getattr(self, key) for key in self.DEFAULTS}
+        settings.update(self.extra)
+        return settings
+
+    def word2vec_kwargs(self):
+        """
+        Dictionary with the settings that are passed
+        to gensim.models.Word2Vec().
+        """
+        kwargs = {key: getattr(self, key) for key in self.WORD2VEC_SETTINGS}
+        kwargs.update(self.extra)
+        return kwargs
+
+    @classmethod
+    def load(cls, path=None, **overrides):
+        """
+        Loads settings from a JSON file and from
+        environment variables.
+
+        Parameters
+        ----------
+        path: str, default None
+            Path to a JSON file with settings. Defaults
+            to the value of `W2V_CONFIG`, if set.
+
+        **overrides:
+            Settings that take precedence over all others.
+
+        Returns
+        -------
+        TrainingConfig
+        """
+        settings = {}
+
+        path = path or os.getenv('W2V_CONFIG')
+        if path:
+            with open(path) as f:
+                settings.update(json.load(f))
+
+        for key in cls.DEFAULTS:
+            value = os.getenv(f'W2V_{key.upper()}')
+            if value is not None:
+                settings[key] = json.loads(value)
+
+        settings.update(overrides)
+        return cls(**settings)
@@ -0,0 +1,74 @@
+"""
+Streaming corpus of sentences for
+training word2vec models.
+"""
+import os
+
+
+class Corpus:
+    """
+    Restartable iterable of sentences stored in text files,
+    one sentence per line with words separated by spaces.
+    Every iteration reads the files again from disk, so
+    gensim can make several passes over a corpus without
+    holding it in memory.
+
+    Parameters
+    ----------
+    paths: str or list
+        Path, or list of paths, of corpus files.
+
+    buffer_size: int, default 1048576
+        Size in bytes of the read buffer of each file.
+        Together with the length of the longest line,
+        it bounds the memory used while iterating.
+    """
+    def __init__(self, paths,
+                 buffer_size=int(os.getenv('CORPUS_BUFFER_SIZE', 2**20))):
+        if isinstance(paths, str):
+            paths = [paths]
+
+        self.paths = list(paths)
+        self.buffer_size = buffer_size
+
+    def __repr__(self):
+        return f'Corpus({self.paths})'
+
+    def __iter__(self):
+        for path in self.paths:
+            with open(path, buffering=self.buffer_size) as f:
+                for line in f:
+                    words = line.split()
+                    if words:
+                        yield words
+
+    @classmethod
+    def write(cls, lines, path,
+              buffer_size=int(os.getenv('CORPUS_BUFFER_SIZE', 2**20))):
+        """
+        Writes lines of text to a corpus file and
+        returns a corpus that streams it.
+
+        Parameters
+        ----------
+        lines: iterable
+            Iterable of strings with one or more
+            sentences each, separated by new lines.
+
+        path: str
+            Path of the corpus file to write.
+
+        buffer_size: int, default 1048576
+            Size in bytes of the write and
+            read buffers.
+
+        Returns
+        -------
+        Corpus
+        """
+        with open(path, 'w', buffering=buffer_size) as f:
+            for line in lines:
+                if line:
+                    f.write(line.rstrip('\n') + '\n')
+
+        return cls(path, buffer_size=buffer_size)
@@ -0,0 +1,296 @@
+"""
+Coin-only embeddings extracted from a trained
+model, small enough to be served without gensim.
+"""
+import os
+import numpy as np
+
+from skill.related import related_coins
+
+
+def embeddings_path(model_path):
+    """
+    Path of the coin embeddings saved
+    next to a model file.
+
+    Parameters
+    ----------
+    model_path: str
+        Path to a model file (e.g. `models/2018W32.model`).
+
+    Returns
+    -------
+    str
+        Path to the coin embeddings
+        (e.g. `models/2018W32.coins.npz`).
+    """
+    root, _ = os.path.splitext(model_path)
+    return root + '.coins.npz'
+
+
+class CoinVectors:
+    """
+    Word vectors of coin names only, stored as a
+    single matrix with one row per coin and an index
+    from lower-cased coin name to row. Supports `in`
+    and `[]` like gensim's KeyedVectors, so it can be
+    used in their place by related_coins().
+
+    Parameters
+    ----------
+    names: list
+        Lower-cased coin names, one per row.
+
+    vectors: numpy.ndarray
+        Matrix of shape (len(names), size).
+
+    scales: numpy.ndarray, default None
+        Scale of every row of an int8 matrix. Rows
+        are multiplied by their scale when read.
+    """
+    DTYPES = ['float32', 'float16', 'int8']
+
+    def __init__(self, names, vectors, scales=None):
+        self.names = list(names)
+        self.vectors = vectors
+        self.scales = scales
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_vectors(cls, vectors, coins, dtype='float32'):
+        """
+        Extracts the vectors of a list of coins
+        from a trained model.
+
+        Parameters
+        ----------
+        vectors: gensim.models.KeyedVectors
+            Word vectors of a trained model.
+
+        coins: list
+            List of coin dictionaries from
+            CoinMarketCap.listings().
+
+        dtype: str, default 'float32'
+            Type of the stored matrix. One
+            of 'float32', 'float16' or 'int8'.
+
+        Returns
+        -------
+        CoinVectors
+        """
+        names = []
+        seen = set()
+        for coin in coins:
+            name = coin['name'].lower()
+            if name in vectors and name not in seen:
+                names.append(name)
+                seen.add(name)
+
+        #
+        #  Without any coin, the matrix still
+        #  has one column per dimension.
+        #
+        if names:
+            matrix = np.array([vectors[name] for name in names], dtype=np.float32)
+        else:
+            matrix = np.zeros((0, getattr(vectors, 'vector_size', 0)), dtype=np.float32)
+        return cls(names, matrix).quantize(dtype)
+
+    def quantize(self, dtype):
+        """
+        Converts the matrix to a smaller type.
+
+        float16 halves the size of a float32 matrix.
+        int8 quarters it: every row is divided by its
+        largest absolute value over 127 and rounded, and
+        that scale is kept to restore the row when read.
+
+        Parameters
+        ----------
+        dtype: str
+            One of 'float32', 'float16' or 'int8'.
+
+        Returns
+        -------
+        CoinVectors
+            New embeddings with the converted matrix.
+        """
+        if dtype not in self.DTYPES:
+            raise ValueError(f'Unsupported dtype {dtype}. Use one of {self.DTYPES}.')
+
+        matrix = self.dequantize()
+        if dtype != 'int8':
+            return CoinVectors(self.names, matrix.astype(dtype))
+
+        scales = np.abs(matrix).max(axis=1) / 127 if len(matrix) else np.zeros(0)
+        scales[scales == 0] = 1
+        quantized = np.round(matrix / scales[:, None]).astype(np.int8)
+        return CoinVectors(self.names, quantized, scales.astype(np.float32))
+
+    @property
+    def dtype(self):
+        """
+        Type of the stored matrix, as accepted by quantize().
+        """
+        return 'int8' if self.scales is not None else self.vectors.dtype.name
+
+    def extend(self, vectors, coins):
+        """
+        Adds the vectors of coins missing from
+        these embeddings, keeping their type.
+
+        Parameters
+        ----------
+        vectors: gensim.models.KeyedVectors
+            Word vectors of the whole vocabulary.
+
+        coins: list
+            List of coin dictionaries to add.
+
+        Returns
+        -------
+        CoinVectors
+            New embeddings. Coins that are already present
+            or missing from `vectors` are left out.
+        """
+        coins = [coin for coin in coins if coin['name'].lower() not in self]
+        added = CoinVectors.from_vectors(vectors, coins)
+        if not len(added):
+            return self
+        if not len(self):
+            return added.quantize(self.dtype)
+
+        matrix = np.concatenate([self.dequantize(), added.vectors])
+        return CoinVectors(self.names + added.names, matrix).quantize(self.dtype)
+
+    def dequantize(self):
+        """
+        Full matrix as float32, with the
+        scales of int8 matrices applied.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        matrix = self.vectors.astype(np.float32)
+        if self.scales is not None:
+            matrix *= self.scales[:, None]
+        return matrix
+
+    @property
+    def vector_size(self):
+        """
+        Dimensionality of the word vectors.
+        """
+        return self.vectors.shape[1]
+
+    @property
+    def nbytes(self):
+        """
+        Size of the matrix and its scales in bytes.
+        """
+        scales = self.scales.nbytes if self.scales is not None else 0
+        return self.vectors.nbytes + scales
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads coin embeddings written by save().
+
+        Parameters
+        ----------
+        path: str
+            Path to an `.npz` file.
+
+        Returns
+        -------
+        CoinVectors
+        """
+        with np.load(path) as data:
+            scales = data['scales'] if 'scales' in data.files else None
+            return cls(data['names'].tolist(), data['vectors'], scales)
+
+    def save(self, path):
+        """
+        Writes the names and the matrix to
+        an uncompressed `.npz` file.
+
+        Parameters
+        ----------
+        path: str
+            Destination path. Must end in `.npz`.
+        """
+        arrays = {'names': np.array(self.names), 'vectors': self.vectors}
+        if self.scales is not None:
+            arrays['scales'] = self.scales
+        np.savez(path, **arrays)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __getitem__(self, name):
+        i = self.index[name]
+        vector = self.vectors[i].astype(np.float32)
+        if self.scales is not None:
+            vector *= self.scales[i]
+        return vector
+
+    def __len__(self):
+        return len(self.names)
+
+
+def quantization_report(embeddings, coins, limit=10, dtypes=('float16', 'int8')):
+    """
+    Measures how much quantization changes the related
+    coins, compared with the float32 embeddings.
+
+    Parameters
+    ----------
+    embeddings: CoinVectors
+        Embeddings to quantize.
+
+    coins: list
+        List of coin dictionaries from
+        CoinMarketCap.listings().
+
+    limit: int, default 10
+        Number of related coins compared for every coin.
+
+    dtypes: tuple, default ('float16', 'int8')
+        Types to compare with float32.
+
+    Returns
+    -------
+    report: dict
+        Dictionary keyed by type with:
+
+            * `bytes`: size of the matrix.
+            * `overlap`: average fraction of the top `limit`
+               related coins that are the same as with float32.
+            * `identical`: fraction of coins whose related
+               coins are the same and in the same order.
+    """
+    reference = embeddings.quantize('float32')
+    expected = related_coins(reference, coins, limit=limit)
+
+    report = {'float32': {'bytes': reference.nbytes, 'overlap': 1.0, 'identical': 1.0}}
+    for dtype in dtypes:
+        quantized = embeddings.quantize(dtype)
+        results = related_coins(quantized, coins, limit=limit)
+
+        overlap = []
+        identical = []
+        for name, related in expected.items():
+            want = [coin['slug'] for coin in related]
+            got = [coin['slug'] for coin in results.get(name, [])]
+            overlap.append(len(set(want) & set(got)) / len(want) if want else 1.0)
+            identical.append(want == got)
+
+        report[dtype] = {
+            'bytes': quantized.nbytes,
+            'overlap': float(np.mean(overlap)) if overlap else 1.0,
+            'identical': float(np.mean(identical)) if identical else 1.0
+        }
+
+    return report
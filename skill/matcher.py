@@ -0,0 +1,209 @@
+"""
+Multi-pattern matcher for finding coin names,
+their plurals and their symbols in text.
+"""
+import re
+
+#
+#  Mirrors the definition of `\w` used by
+#  the `re` module so word boundaries are
+#  identical to the ones of a `\b` regex.
+#
+WORD = re.compile(r'\w')
+
+
+class CoinMatcher:
+    """
+    Trie-based matcher built once from the list of
+    currencies and symbols. It finds every name, plural
+    and symbol in a single pass over a text, instead of
+    running one regular expression per coin.
+
+    Names and plurals are matched case-insensitively and
+    symbols are matched case-sensitively, all of them
+    bounded by word boundaries (i.e. `\\b`).
+
+    Parameters
+    ----------
+    currencies: list
+        List of currency names (e.g. 'Bitcoin').
+
+    symbols: list
+        List of currency symbols (e.g. 'BTC'). Must
+        have the same length as `currencies`.
+    """
+    TERMINAL = None
+
+    def __init__(self, currencies, symbols):
+        self.names = {}
+        self.symbols = {}
+
+        for i, (currency, symbol) in enumerate(zip(currencies, symbols)):
+            self.add(i, currency, symbol)
+
+    @classmethod
+    def from_coins(cls, coins):
+        """
+        Builds a matcher that reports coins by id
+        instead of by their position in a list.
+
+        Parameters
+        ----------
+        coins: list
+            List of coin dictionaries from
+            CoinMarketCap.listings().
+
+        Returns
+        -------
+        CoinMatcher
+        """
+        matcher = cls([], [])
+        for coin in coins:
+            matcher.add(coin['id'], coin['name'], coin['symbol'])
+        return matcher
+
+    def add(self, index, currency, symbol):
+        """
+        Adds a coin to the matcher.
+
+        Parameters
+        ----------
+        index: int
+            Index reported for the coin's matches.
+
+        currency: str
+            Currency name (e.g. 'Bitcoin').
+
+        symbol: str
+            Currency symbol (e.g. 'BTC').
+        """
+        self.__insert(self.names, currency.lower(), ('name', index))
+        self.__insert(self.names, currency.lower() + 's', ('plural', index))
+        self.__insert(self.symbols, symbol, ('symbol', index))
+
+    def remove(self, index, currency, symbol):
+        """
+        Removes a coin added with add(). Other coins
+        keep their indexes.
+
+        Parameters
+        ----------
+        index: int
+            Index the coin was added with.
+
+        currency: str
+            Currency name.
+
+        symbol: str
+            Currency symbol.
+        """
+        self.__delete(self.names, currency.lower(), index)
+        self.__delete(self.names, currency.lower() + 's', index)
+        self.__delete(self.symbols, symbol, index)
+
+    def __insert(self, trie, word, value):
+        """
+        Adds a word to a trie. Terminal nodes keep
+        a list of (kind, index) tuples because
+        different coins may share a name or a symbol.
+        """
+        if not word:
+            return
+
+        node = trie
+        for character in word:
+            node = node.setdefault(character, {})
+        node.setdefault(self.TERMINAL, []).append(value)
+
+    def __delete(self, trie, word, index):
+        """
+        Removes the values of a coin from the terminal
+        node of a word. The list is replaced rather than
+        modified, so concurrent searches see either the
+        old or the new list. Nodes are left in place.
+        """
+        node = trie
+        for character in word:
+            node = node.get(character)
+            if node is None:
+                return
+
+        if self.TERMINAL in node:
+            node[self.TERMINAL] = [
+                value for value in node[self.TERMINAL] if value[1] != index
+            ]
+
+    @staticmethod
+    def __boundary(string, position):
+        """
+        Checks if a position in a string is a word
+        boundary, following the semantics of `\\b`.
+        """
+        before = position > 0 and bool(WORD.match(string[position - 1]))
+        after = position < len(string) and bool(WORD.match(string[position]))
+        return before != after
+
+    def __walk(self, trie, string, start, boundaries, lower):
+        """
+        Walks a trie from a starting position, yielding
+        every terminal node that ends on a word boundary.
+        """
+        node = trie
+        for end in range(start, len(string) + 1):
+            if self.TERMINAL in node and boundaries[end]:
+                for kind, index in node[self.TERMINAL]:
+                    yield kind, index, end
+
+            if end == len(string):
+                break
+
+            character = string[end].lower() if lower else string[end]
+            node = node.get(character)
+            if node is None:
+                break
+
+    def find(self, string):
+        """
+        Finds all coin mentions in a string.
+
+        Parameters
+        ----------
+        string: str
+            Text to search for coins.
+
+        Returns
+        -------
+        matches: dict
+            Dictionary keyed by coin index. Each value is
+            a dictionary with the keys `name`, `plural` and
+            `symbol`, each holding a list of (start, end)
+            tuples in the order they appear in the text.
+            Matches for the same pattern never overlap,
+            like the ones returned by `re.finditer`.
+        """
+        boundaries = [
+            self.__boundary(string, i) for i in range(len(string) + 1)
+        ]
+
+        matches = {}
+        last_end = {}
+        for start in range(len(string)):
+            if not boundaries[start]:
+                continue
+
+            hits = list(self.__walk(self.names, string, start, boundaries, True))
+            hits.extend(self.__walk(self.symbols, string, start, boundaries, False))
+
+            for kind, index, end in hits:
+                if last_end.get((kind, index), 0) > start:
+                    continue
+                last_end[(kind, index)] = end
+
+                coin = matches.setdefault(index, {
+                    'name': [],
+                    'plural': [],
+                    'symbol': []
+                })
+                coin[kind].append((start, end))
+
+        return matches
@@ -0,0 +1,164 @@
+"""
+Interface for the local store of daily
+coin prices kept in the database.
+"""
+import os
+
+from skill.storage import Storage
+
+COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume', 'market_cap']
+
+
+class PriceHistory:
+    """
+    Class that provides an interface for the daily
+    prices of coins stored in the `price_history`
+    table. Days are appended as they are fetched from
+    CoinMarketCap, so every window is then read with
+    a range query over the table's primary key. The
+    days checked for every coin are recorded in the
+    `price_history_coverage` table, including days
+    without prices.
+
+    """
+    def __init__(self):
+        self.uri = os.getenv('POSTGRES_URI')
+
+    def bounds(self, slug):
+        """
+        First and last days of a coin that are stored
+        or were checked with cover().
+
+        Parameters
+        ----------
+        slug: str
+            Coin slug (e.g. `bitcoin`).
+
+        Returns
+        -------
+        first, last: datetime.date
+            Both None if no day is stored or checked.
+        """
+        with Storage(self.uri, pool=True) as S:
+            rows = S.execute("""
+                SELECT
+                    least(prices.first, coverage.checked_from) AS first,
+                    greatest(prices.last, coverage.checked_to) AS last
+                FROM (
+                    SELECT min(date) AS first, max(date) AS last
+                    FROM price_history
+                    WHERE slug = %s
+                ) AS prices
+                LEFT JOIN price_history_coverage AS coverage
+                    ON coverage.slug = %s
+                """, [slug, slug])
+
+        return rows[0]['first'], rows[0]['last']
+
+    def cover(self, slug, start, stop):
+        """
+        Records that the days of a coin between `start`
+        and `stop` were checked, whether or not it has
+        prices for them. The range only grows, so it
+        must be contiguous with the stored days.
+
+        Parameters
+        ----------
+        slug: str
+            Coin slug (e.g. `bitcoin`).
+
+        start, stop: datetime.date
+            First and last days checked.
+        """
+        with Storage(self.uri, pool=True) as S:
+            S.execute("""
+                INSERT INTO price_history_coverage (slug, checked_from, checked_to)
+                    VALUES (%s, %s, %s)
+                ON CONFLICT (slug) DO UPDATE
+                    SET checked_from = least(
+                            price_history_coverage.checked_from,
+                            EXCLUDED.checked_from),
+                        checked_to = greatest(
+                            price_history_coverage.checked_to,
+                            EXCLUDED.checked_to),
+                        db_update_time = current_timestamp
+                """, [slug, start, stop])
+
+    def read(self, slug, start, stop):
+        """
+        Reads the daily prices of a coin.
+
+        Parameters
+        ----------
+        slug: str
+            Coin slug (e.g. `bitcoin`).
+
+        start, stop: datetime.date
+            First and last days to read.
+
+        Returns
+        -------
+        list
+            List of dictionaries with the keys `date`
+            (YYYY-MM-DD), `open`, `high`, `low`, `close`,
+            `volume` and `market_cap`, in ascending
+            order of date.
+        """
+        with Storage(self.uri, pool=True) as S:
+            rows = S.execute("""
+                SELECT
+                    to_char(date, 'YYYY-MM-DD') AS date,
+                    open,
+                    high,
+                    low,
+                    close,
+                    volume,
+                    market_cap
+                FROM price_history
+                WHERE slug = %s
+                    AND date >= %s
+                    AND date <= %s
+                ORDER BY date
+                """, [slug, start, stop])
+
+        return [dict(row) for row in rows]
+
+    def save(self, slug, records):
+        """
+        Saves the daily prices of a coin. Days already
+        stored are kept, as prices of past days do not
+        change, so requests filling the same days at
+        the same time do not conflict.
+
+        Parameters
+        ----------
+        slug: str
+            Coin slug (e.g. `bitcoin`).
+
+        records: list
+            List of dictionaries in the format
+            returned by read().
+
+        Returns
+        -------
+        int
+            Number of days saved.
+        """
+        if not records:
+            return 0
+
+        values = [[record[column] for record in records] for column in COLUMNS]
+        with Storage(self.uri, pool=True) as S:
+            return S.execute("""
+                INSERT INTO price_history
+                    (slug, date, open, high, low, close, volume, market_cap)
+                    SELECT %s, * FROM unnest(
+                        %s::date[],
+                        %s::double precision[],
+                        %s::double precision[],
+                        %s::double precision[],
+                        %s::double precision[],
+                        %s::double precision[],
+                        %s::double precision[])
+                ON CONFLICT (slug, date) DO NOTHING
+                """, [slug] + values)
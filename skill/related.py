@@ -0,0 +1,289 @@
+"""
+Logic for computing related coins from
+word embeddings.
+"""
+import os
+import json
+import numpy as np
+
+
+def related_coins(vectors, coins, limit=10, rows=None):
+    """
+    Computes the most similar coins for every coin
+    available in a set of word vectors. All vectors
+    are gathered in a single normalized matrix, so
+    the full similarity matrix is computed with one
+    matrix multiplication.
+
+    Parameters
+    ----------
+    vectors: gensim.models.KeyedVectors
+        Word vectors keyed by lower-cased coin name.
+        Any object that supports `in` and `[]` works.
+
+    coins: list
+        List of coin dictionaries from
+        CoinMarketCap.listings().
+
+    limit: int, default 10
+        Number of related coins kept for
+        every coin. None keeps all of them.
+
+    rows: iterable, default None
+        Lower-cased names of the coins to compute
+        related coins for. Every coin is still
+        considered as a related coin. None
+        computes them for all coins.
+
+    Returns
+    -------
+    results: dict
+        Dictionary with lower-cased coin names as keys
+        and lists of related coins as values, sorted
+        from the most to the least similar. Example:
+
+            {
+                'litecoin': [
+                    {
+                        'name': 'Ethereum',
+                        'slug': 'ethereum',
+                        'value': 0.76,
+                        'url': ''
+                    }
+                ]
+            }
+    """
+    keys = []
+    names = []
+    slugs = []
+    seen = set()
+    for coin in coins:
+        key = coin['name'].lower()
+        if key in seen or key not in vectors:
+            continue
+
+        seen.add(key)
+        keys.append(key)
+        names.append(coin['name'])
+        slugs.append(coin['website_slug'])
+
+    if not keys:
+        return {}
+
+    matrix = np.array([vectors[key] for key in keys], dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    matrix /= norms
+
+    if rows is None:
+        selected = np.arange(len(keys))
+    else:
+        rows = set(rows)
+        selected = np.array(
+            [i for i, key in enumerate(keys) if key in rows], dtype=int)
+
+    similarity = np.dot(matrix[selected], matrix.T)
+    similarity[np.arange(len(selected)), selected] = -np.inf
+
+    k = len(keys) - 1
+    if limit is not None:
+        k = min(limit, k)
+
+    if k <= 0 or not len(selected):
+        return {keys[i]: [] for i in selected}
+
+    #
+    #  Partial sort: only the top K columns of
+    #  every row are selected, and only those
+    #  are then sorted.
+    #
+    index = np.arange(len(selected))[:, None]
+    top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+    order = np.argsort(-similarity[index, top], axis=1)
+    top = top[index, order]
+
+    results = {}
+    for i, row in enumerate(selected):
+        results[keys[row]] = [{
+            'name': names[j],
+            'slug': slugs[j],
+            'value': float(similarity[i, j]),
+            'url': ''
+        } for j in top[i]]
+
+    return results
+
+
+def update_related(results, vectors, coins, added, removed, limit=10):
+    """
+    Updates a related coins table after coins are added to
+    or removed from the catalog. Only the rows that can
+    change are computed again: the ones of added coins,
+    the ones that listed a removed coin, and the ones an
+    added coin is similar enough to enter.
+
+    Parameters
+    ----------
+    results: dict
+        Output from related_coins(). It is not modified.
+
+    vectors: gensim.models.KeyedVectors
+        Word vectors keyed by lower-cased coin name.
+
+    coins: list
+        Updated list of coin dictionaries.
+
+    added: list
+        Coin dictionaries added to the catalog.
+
+    removed: list
+        Coin dictionaries removed from the catalog.
+
+    limit: int, default 10
+        Number of related coins kept for every coin.
+
+    Returns
+    -------
+    results: dict
+        New related coins table.
+    """
+    removed_keys = {coin['name'].lower() for coin in removed}
+    table = {
+        key: related for key, related in results.items()
+        if key not in removed_keys
+    }
+
+    rows = {
+        key for key, related in table.items()
+        if any(coin['name'].lower() in removed_keys for coin in related)
+    }
+
+    added_keys = [
+        coin['name'].lower() for coin in added
+        if coin['name'].lower() in vectors
+    ]
+    rows.update(added_keys)
+
+    if added_keys:
+        matrix = np.array([vectors[key] for key in added_keys], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        matrix /= norms
+
+        for key, related in table.items():
+            if key in rows or key not in vectors:
+                continue
+
+            if limit is None or len(related) < limit:
+                rows.add(key)
+                continue
+
+            vector = np.asarray(vectors[key], dtype=np.float32)
+            norm = np.linalg.norm(vector) or 1
+            if np.max(np.dot(matrix, vector / norm)) > related[-1]['value']:
+                rows.add(key)
+
+    table.update(related_coins(vectors, coins, limit=limit, rows=rows))
+    return table
+
+
+def related_path(model_path):
+    """
+    Path of the related coins table saved
+    next to a model file.
+
+    Parameters
+    ----------
+    model_path: str
+        Path to a model file (e.g. `models/2018W32.model`).
+
+    Returns
+    -------
+    str
+        Path to the companion related coins
+        table (e.g. `models/2018W32.related.json`).
+    """
+    root, _ = os.path.splitext(model_path)
+    return root + '.related.json'
+
+
+def compact_related(results):
+    """
+    Converts a related coins table to a compact form,
+    with one [name, slug, value] list per related coin.
+    The empty `url` values are not kept.
+
+    Parameters
+    ----------
+    results: dict
+        Output from related_coins().
+
+    Returns
+    -------
+    dict
+    """
+    return {
+        key: [[c['name'], c['slug'], c['value']] for c in related]
+        for key, related in results.items()
+    }
+
+
+def expand_related(table):
+    """
+    Converts a table from compact_related()
+    back to the output format of related_coins().
+
+    Parameters
+    ----------
+    table: dict
+        Output from compact_related().
+
+    Returns
+    -------
+    dict
+    """
+    return {
+        key: [{
+            'name': name,
+            'slug': slug,
+            'value': value,
+            'url': ''
+        } for name, slug, value in related]
+        for key, related in table.items()
+    }
+
+
+def save_related(results, path):
+    """
+    Saves a related coins table as compact JSON.
+
+    Parameters
+    ----------
+    results: dict
+        Output from related_coins().
+
+    path: str
+        Path to write the table to.
+    """
+    with open(path, 'w') as f:
+        json.dump(compact_related(results), f, separators=(',', ':'))
+
+
+def load_related(path):
+    """
+    Loads a related coins table saved
+    with save_related().
+
+    Parameters
+    ----------
+    path: str
+        Path to the related coins table.
+
+    Returns
+    -------
+    results: dict
+        Dictionary in the same format as the
+        output from related_coins().
+    """
+    with open(path) as f:
+        return expand_related(json.load(f))
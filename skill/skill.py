@@ -1,19 +1,27 @@
 """
 Skill can find cryptocurrencies in text, and give their current listings.
 """
-import re
 import os
 import time 
-import gensim
+import psycopg2
+import requests
 import schedule
+import threading
 import plotly
 import plotly.plotly as py
 
 from isoweek import Week
 from sanic.log import logger
 from memoize import Memoizer
-from nltk.corpus import wordnet as wn
 from datetime import datetime, timedelta
+from skill.cache import ModelCache
+from skill.matcher import CoinMatcher
+from skill.catalog import CoinIndex, filter_listings
+from skill.artifacts import read_manifest, published_path, vectors_path
+from skill.embeddings import CoinVectors, embeddings_path
+from skill.related import (related_coins, related_path, load_related,
+                           update_related)
+from skill.snapshot import save_snapshot, load_snapshot, is_stale
 from skill.bitcointalk import BitcoinTalk
 from skill.coinmarketcap import CoinMarketCap
 
@@ -21,6 +29,113 @@ store = {}
 cached = Memoizer(store)
 
 
+class ModelState:
+    """
+    Model served by the Crypto class, together with
+    its related coins table. A new state is built in
+    full before it replaces the current one.
+
+    Parameters
+    ----------
+    model_path: str
+        Location of the model.
+
+    comparison_results: dict, default None
+        Related coins table of the model.
+    """
+    def __init__(self, model_path, comparison_results=None):
+        self.model_path = model_path
+        self.comparison_results = comparison_results
+        self._model = None
+
+    @property
+    def model(self):
+        """
+        Word vectors, loaded on first access from the
+        artifacts exported next to `self.model_path`.
+        In order of preference:
+
+            1. The coin embeddings, which are read
+               without loading gensim at all.
+            2. The serving KeyedVectors, memory-mapped
+               so that all workers share one copy.
+            3. The full Word2Vec model.
+        """
+        if self._model is None:
+            path = embeddings_path(self.model_path)
+            if os.path.exists(path):
+                self._model = CoinVectors.load(path)
+                return self._model
+
+            #
+            #  gensim is only imported when an older
+            #  model without coin embeddings is served.
+            #
+            import gensim
+            path = vectors_path(self.model_path)
+            if os.path.exists(path):
+                self._model = gensim.models.KeyedVectors.load(path, mmap='r')
+            else:
+                self._model = gensim.models.Word2Vec.load(self.model_path)
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+
+    def full_vectors(self):
+        """
+        Word vectors of the whole vocabulary, from the
+        memory-mapped serving KeyedVectors or else from
+        the full Word2Vec model.
+
+        Returns
+        -------
+        gensim.models.KeyedVectors
+            None if neither file is available.
+        """
+        import gensim
+        path = vectors_path(self.model_path)
+        if os.path.exists(path):
+            return gensim.models.KeyedVectors.load(path, mmap='r')
+        if os.path.exists(self.model_path):
+            return gensim.models.Word2Vec.load(self.model_path).wv
+        return None
+
+    def coin_vectors(self, coins):
+        """
+        Word vectors that cover a list of coins. Coin
+        embeddings only hold the coins listed at training
+        time, so they are extended with the vectors of
+        the missing coins from the whole vocabulary.
+
+        Parameters
+        ----------
+        coins: list
+            List of coin dictionaries (e.g. coins
+            added to the catalog).
+
+        Returns
+        -------
+        vectors
+            CoinVectors or gensim.models.KeyedVectors.
+        """
+        vectors = getattr(self.model, 'wv', self.model)
+        if not isinstance(vectors, CoinVectors):
+            return vectors
+
+        if all(coin['name'].lower() in vectors for coin in coins):
+            return vectors
+
+        full = self.full_vectors()
+        if full is None:
+            logger.warning(f'No full vectors for {self.model_path}; '
+                           'new coins have no related coins.')
+            return vectors
+
+        return vectors.extend(full, coins)
+
+
 class Crypto:
     """
     This classes uses the CoinMarketCap library, along with a 
@@ -48,12 +163,90 @@ class Crypto:
 
     def __init__(self, model_path=None):
 
-
+        #
+        #  Catalog refreshes and model swaps both
+        #  replace the state, so they take turns.
+        #
+        self.lock = threading.Lock()
         self.__initialize_variables()
 
     def model_setting(self, model_path=None,original=True):
-        
-        
+        """
+        Sets the model used for finding related coins. The
+        related coins table saved next to the model at training
+        time is loaded directly. The model itself is only loaded
+        when that table is missing and has to be recomputed.
+
+        The new model is fully loaded before it replaces the
+        current one with a single reference assignment, so
+        requests running in the meantime keep being served
+        by the current model. Its related coins table is
+        brought up to date with the current catalog.
+
+        Parameters
+        ----------
+        model_path: str, default None
+            Location of model to load. If left as None,
+            the model from the manifest in MODELS_PATH is
+            used, or else the model from the last week.
+
+        original: bool, default True
+            If the model should also be kept as
+            the previous model.
+
+        Returns
+        -------
+        model, model_path, comparison_results
+            The model (None if it was not loaded), its
+            path and the related coins table.
+        """
+        model_path = self.resolve_model_path(model_path)
+        with self.lock:
+            state = self.load_state(model_path)
+
+            #
+            #  The table is computed at training time, so
+            #  coins listed since then are added to it and
+            #  delisted ones are taken out.
+            #
+            names = {coin['name'].lower() for coin in self.coins}
+            added = [
+                coin for coin in self.coins
+                if coin['name'].lower() not in state.comparison_results
+            ]
+            removed = [
+                {'name': key} for key in state.comparison_results if key not in names
+            ]
+            if added or removed:
+                state = self.__update_state(state, added, removed)
+
+            self.state = state
+            store.clear()
+
+        if original == True:
+            self.previous_model = state._model
+        else: 
+            pass 
+
+        return state._model, state.model_path, state.comparison_results
+
+    def resolve_model_path(self, model_path=None):
+        """
+        Resolves the location of the model to serve.
+
+        Parameters
+        ----------
+        model_path: str, default None
+            Location of model to load. If left as None,
+            the model from the manifest in MODELS_PATH is
+            used, or else the model from the last week.
+
+        Returns
+        -------
+        str
+            Location of the model, or of the fully
+            trained model if that location does not exist.
+        """
         self.full_trained = 'models/trained.model'
     
 
@@ -62,60 +255,267 @@ class Crypto:
         #  then simply try to get the model from
         #  the latest week available.
         #
+        #  Models published by the training job
+        #  are listed in the manifest, which takes
+        #  precedence when available.
+        #
         last_week = str(Week.thisweek() - 1)
         directory = os.getenv('MODELS_PATH')
-        if not model_path:
-            self.model_path = os.path.join(directory, last_week + '.model')
-        else:
-            self.model_path = model_path
-        
+        manifest = read_manifest(directory) if directory else None
+        if not model_path and manifest:
+            model_path = os.path.join(directory, manifest['model'])
+        elif not model_path:
+            model_path = published_path(directory, last_week + '.model')
+
+        if not os.path.exists(model_path):
+            model_path = self.full_trained
 
+        return model_path
+
+    def load_state(self, model_path):
+        """
+        Loads the state of a model: the related coins
+        table saved next to it, or else a table computed
+        from the model itself.
+
+        Parameters
+        ----------
+        model_path: str
+            Location of model to load.
+
+        Returns
+        -------
+        ModelState
+        """
+        state = ModelState(model_path)
         try:
-            self.model = gensim.models.Word2Vec.load(self.model_path)
+            state.comparison_results = load_related(related_path(model_path))
+            logger.info(f'Loaded related coins for {model_path}')
         except FileNotFoundError:
-            self.model = gensim.models.Word2Vec.load(self.full_trained)
-            self.model_path = self.full_trained
+            state.comparison_results = self.coin_comparison(state=state)
 
-        self.comparison_results = self.coin_comparison()
+        return state
 
-        if original == True:
-            self.previous_model = self.model
-        else: 
-            pass 
+    def week_state(self, week=None):
+        """
+        Gets the state of the model of a given week.
+        Models of weeks other than the current one are
+        kept in a bounded cache (see ModelCache).
+
+        Parameters
+        ----------
+        week: str, default None
+            ISO week (e.g. '2018W32'). None
+            returns the current state.
 
-        return self.model, self.model_path, self.comparison_results
+        Returns
+        -------
+        ModelState
+
+        Raises
+        ------
+        ValueError
+            If the week is not a string, is invalid
+            or has no model.
+        """
+        if week is None:
+            return self.state
+
+        if not isinstance(week, str):
+            raise ValueError(f'`week` must be a string such as 2018W32, not {week!r}.')
+
+        week = str(Week.fromstring(week))
+        if os.path.basename(os.path.splitext(self.model_path)[0]) == week:
+            return self.state
+
+        return self.models.get(week)
+
+    def __load_week(self, week):
+        """
+        Loads the state of a week from MODELS_PATH.
+        """
+        directory = os.getenv('MODELS_PATH')
+        model_path = published_path(directory or '', f'{week}.model')
+        if not directory or not (os.path.exists(model_path) or
+                                 os.path.exists(related_path(model_path))):
+            raise ValueError(f'No model available for week {week}.')
 
+        return self.load_state(model_path)
 
-    def __initialize_variables(self):
+    @property
+    def model(self):
+        """
+        Word2Vec model of the current state. It is
+        loaded on first access.
+        """
+        return self.state.model
+
+    @model.setter
+    def model(self, model):
+        self.state.model = model
+
+    @property
+    def model_path(self):
+        """
+        Location of the current model.
+        """
+        return self.state.model_path
+
+    @property
+    def comparison_results(self):
+        """
+        Related coins table of the current model.
+        """
+        return self.state.comparison_results
+
+    def __initialize_variables(self,
+            snapshot_path=os.getenv('SNAPSHOT_PATH', os.path.join(
+                os.getenv('MODELS_PATH') or 'models', 'snapshot.json')),
+            snapshot_max_age=int(os.getenv('SNAPSHOT_MAX_AGE', 60 * 60 * 24))):
         """
         Restricts currencies to only currencies without a definition in WordNet.
+        The catalog and the related coins table are loaded from a
+        snapshot shared by all workers when it is newer than
+        `snapshot_max_age` seconds, and written to it otherwise.
         Returns
         -------
-        self.currencies,self.symbols,self.website_slugs
-            These variables contain the name, symbols, and website_slugs.
+        self.coins,self.index,self.matcher
+            These variables contain the catalog, its indexes
+            and the matcher that finds its coins by id.
         """
 
 
-        coins = CoinMarketCap.listings()
-        currencies = [currency['name'] for currency in coins]
-        # symbols = [currency['symbol']for currency in coins]
-        coin_removal = []
-        undesirable_coins = ['Crypto', 'ICOS', 'Naviaddress', 'B2BX']
-
-        for i, currency in enumerate(currencies):
-            if wn.synsets(currency) or currency in undesirable_coins:
-                coin_removal.append(i)
-
-        for index in sorted(coin_removal, reverse=True):
-            del coins[index]
+        #
+        #  Workers boot from a snapshot of the catalog and
+        #  the related coins table when it is recent. A stale
+        #  snapshot is still used when CoinMarketCap cannot
+        #  be reached or returns a malformed payload. The
+        #  matcher inputs are derived from the catalog.
+        #
+        snapshot = load_snapshot(snapshot_path)
+        if snapshot and not is_stale(snapshot, snapshot_max_age):
+            coins = snapshot['coins']
+        else:
+            try:
+                coins = filter_listings(CoinMarketCap.index().coins)
+            except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+                if not snapshot:
+                    raise
+                logger.warning(f'Could not fetch listings, using stale snapshot: {e}')
+                coins = snapshot['coins']
 
         self.coins = coins
-        self.currencies = [currency['name'] for currency in coins]
-        self.symbols = [currency['symbol'] for currency in coins]
-        self.website_slugs = [currency['website_slug'] for currency in coins]
+        self.index = CoinIndex(coins)
+        self.matcher = CoinMatcher.from_coins(coins)
         self.coin_market_cap = CoinMarketCap()
         self.BitcoinTalk = BitcoinTalk()
-        self.model_setting()
+        self.models = ModelCache(self.__load_week)
+
+        model_path = self.resolve_model_path()
+        if snapshot and coins is snapshot['coins'] and \
+                snapshot['model_path'] == model_path:
+            self.state = ModelState(model_path, snapshot['related'])
+            self.previous_model = None
+            logger.info(f'Loaded startup snapshot from {snapshot_path}')
+            return
+
+        try:
+            self.BitcoinTalk.save_coins(self.coins)
+        except psycopg2.Error as e:
+            logger.warning(f'Could not save coin catalog: {e}')
+
+        self.model_setting(model_path)
+
+        #
+        #  Coins from a stale snapshot keep its creation
+        #  time, so later workers still try to fetch
+        #  fresh listings.
+        #
+        created = snapshot['created'] if snapshot and coins is snapshot['coins'] else None
+        try:
+            save_snapshot(snapshot_path, self.coins, self.model_path,
+                          self.comparison_results, created=created)
+        except OSError as e:
+            logger.warning(f'Could not save startup snapshot: {e}')
+
+    def refresh_catalog(self):
+        """
+        Refreshes the coin catalog from the latest listings.
+        Only the coins that were added or removed are applied
+        to the matcher and to the related coins table.
+
+        The matcher reports coins by id, which are looked up
+        in the catalog index. Removed coins are taken out of
+        the matcher before the index is replaced, and added
+        ones are put in after, so every coin the matcher
+        finds is in the index. Refreshes take turns with
+        model_setting(), so neither undoes the state the
+        other one sets.
+
+        Returns
+        -------
+        dict
+            Number of coins `added` and `removed`.
+        """
+        coins = filter_listings(CoinMarketCap.index().coins)
+
+        with self.lock:
+            current = self.index.by_id
+            latest = CoinIndex(coins)
+            added = [coin for coin in coins if current.get(coin['id']) != coin]
+            removed = [
+                coin for coin in self.coins if latest.by_id.get(coin['id']) != coin
+            ]
+            if not added and not removed:
+                return {'added': 0, 'removed': 0}
+
+            for coin in removed:
+                self.matcher.remove(coin['id'], coin['name'], coin['symbol'])
+
+            self.coins = coins
+            self.index = latest
+
+            for coin in added:
+                self.matcher.add(coin['id'], coin['name'], coin['symbol'])
+
+            self.state = self.__update_state(self.state, added, removed)
+            store.clear()
+
+        try:
+            self.BitcoinTalk.save_coins(self.coins)
+        except psycopg2.Error as e:
+            logger.warning(f'Could not save coin catalog: {e}')
+
+        logger.info(f'Catalog refreshed: {len(added)} added, {len(removed)} removed')
+        return {'added': len(added), 'removed': len(removed)}
+
+    def __update_state(self, state, added, removed):
+        """
+        Applies coins added to or removed from the catalog
+        to the related coins table of a state. Coin embeddings
+        are extended with the added coins, which are not in
+        them if they were listed after the model was trained.
+
+        Parameters
+        ----------
+        state: ModelState
+            State to update. It is not modified.
+
+        added, removed: list
+            Coin dictionaries added to and
+            removed from the catalog.
+
+        Returns
+        -------
+        ModelState
+            New state of the same model.
+        """
+        vectors = state.coin_vectors(added)
+        comparison_results = update_related(
+            state.comparison_results, vectors, self.coins, added, removed)
+        updated = ModelState(state.model_path, comparison_results)
+        updated.model = vectors
+        return updated
 
     def _collect_coin_data(self,
                             coin,
@@ -157,9 +557,10 @@ class Crypto:
     @cached(max_age=60 * 60 * 10)
     def regex_crypto_currency_finder(self, string):
         '''
-        This uses a regex to find a given currency, and place it in a list. 
+        This uses a prebuilt matcher to find a given currency, and place it in a list. 
         The list then places its results in the results dictionary. 
-        This is done for regular currencies, its plurals, and its' symbols.
+        This is done for regular currencies, its plurals, and its' symbols,
+        all of them in a single pass over the text.
         Parameters
         ----------
         text: str
@@ -171,101 +572,72 @@ class Crypto:
         '''
 
         results = []
-        matches = {}
-        caught_coin = []
+        caught_coin = set()
         logger.info('Running regex on input')
 
-        for i, currency in enumerate(self.currencies):
-            regex = r"\b{}\b".format(currency)
-            pattern = list(re.finditer(regex, string, re.I | re.M))
-
-            count = 0
-            # SINGULAR
-            for match in pattern:
-                if count == 0:
-                    results.append({
-                        "sentence": string,
-                        "cryptocurrency": self.website_slugs[i],
-                        "name": self.currencies[i],
-                        "findings": [{
-                            "name_start": match.start(),
-                            "name_end": match.end()
-                        }]
-                    })
-                    count = count + 1
-                else:
-                    matches.update({'name_start': match.start()})
-                    matches.update({'name_end': match.end()})
-                    for result in results:
-                        if result['name'] == self.currencies[i]:
-                            result['findings'].append(matches)
-                        else:
-                            pass
-                    matches = {}
-
-            regex_plural = r"\b{}s\b".format(currency)
-            pattern_plural = list(
-                re.finditer(regex_plural, string, re.I | re.M))
+        hits = self.matcher.find(string)
 
-            #PLURAL
-            for match in pattern_plural:
+        #
+        #  The matcher reports coin ids. A coin removed
+        #  by a catalog refresh in the meantime is skipped.
+        #  Coins are visited in catalog (rank) order, so
+        #  ties in the number of findings are broken by
+        #  rank when results are limited.
+        #
+        index = self.index
+        coins = {}
+        for i in hits:
+            coin = index.by_id.get(i)
+            if coin is not None:
+                coins[i] = coin
+        order = sorted(coins, key=index.ranks.get)
+
+        for i in order:
+            #
+            #  Singular matches come before plural
+            #  ones for every coin, as with the
+            #  original per-coin regex scans.
+            #
+            spans = hits[i]['name'] + hits[i]['plural']
+            for count, (start, end) in enumerate(spans):
                 if count == 0:
                     results.append({
                         "sentence": string,
-                        "cryptocurrency": self.website_slugs[i],
-                        "name": self.currencies[i],
+                        "cryptocurrency": coins[i]['website_slug'],
+                        "name": coins[i]['name'],
                         "findings": [{
-                            "name_start": match.start(),
-                            "name_end": match.end()
+                            "name_start": start,
+                            "name_end": end
                         }]
                     })
-                    count = count + 1
                 else:
-                    matches.update({'name_start': match.start()})
-                    matches.update({'name_end': match.end()})
+                    matches = {'name_start': start, 'name_end': end}
                     for result in results:
-                        if result['name'] == self.currencies[i]:
+                        if result['name'] == coins[i]['name']:
                             result['findings'].append(matches)
-                        else:
-                            pass
-                    matches = {}
 
-            if count > 0:
-                caught_coin.append(i)
-            else:
-                pass
-            count = 0
+            if spans:
+                caught_coin.add(i)
 
-        count = 0
         #SYMBOL
 
-        for i, symbol in enumerate(self.symbols):
-            regex_symbol = r"\b{}\b".format(symbol)
-            pattern_symbol = list(re.finditer(regex_symbol, string))
-
-            for match in pattern_symbol:
+        for i in order:
+            for count, (start, end) in enumerate(hits[i]['symbol']):
                 if count == 0 and i not in caught_coin:
                     results.append({
                         "sentence": string,
-                        "cryptocurrency": self.website_slugs[i],
-                        "name": self.currencies[i],
+                        "cryptocurrency": coins[i]['website_slug'],
+                        "name": coins[i]['name'],
                         "findings": [{
-                            "symbol_start": match.start(),
-                            "symbol_end": match.end()
+                            "symbol_start": start,
+                            "symbol_end": end
                         }]
                     })
-                    count = count + 1
                 elif i in caught_coin:
-                    matches.update({'name_start': match.start()})
-                    matches.update({'name_end': match.end()})
-
+                    matches = {'name_start': start, 'name_end': end}
                     for result in results:
-                        if result['name'] == self.currencies[i]:
+                        if result['name'] == coins[i]['name']:
                             result['findings'].append(matches)
-                        else:
-                            pass
-                    matches = {}
-            count = 0
 
         if not results:
             logger.info(
@@ -278,7 +650,7 @@ class Crypto:
         return results
 
     @cached(max_age=60*60*10)
-    def text(self, text, limit):
+    def text(self, text, limit, week=None):
         """
         Uses text as an input. Regex search is called on text in order to return
         information about found cryptocurrencies
@@ -289,6 +661,9 @@ class Crypto:
         limit: int 
             Limits regex output to value of int. Currencies with the most finds
             are the ones returned.
+        week: str, default None
+            ISO week (e.g. '2018W32') of the model used for
+            related coins. Defaults to the current model.
         Returns
         -------
         result: Array of Objects
@@ -298,6 +673,7 @@ class Crypto:
 
         logger.info('Running skill. Input size: {} characters'.format(len(text)))
 
+        state = self.week_state(week)
         findings = self.regex_crypto_currency_finder(text)
 
         sorted_findings = sorted(
@@ -313,41 +689,38 @@ class Crypto:
             d for d in findings if d['cryptocurrency'] in top_coins
         ]
 
-        results = []
-
-        logger.info(f'The length of the findings is: {len(top_findings)}')
-
+        related_by_coin = {}
         for finding in top_findings:
-            related = []
-
             try:
-                logger.info(f"Starting related calculation for {finding['name']}")
-
-                related = self.comparison_results[finding['name'].lower()][:5]
+                related_by_coin[finding['name']] = [
+                    dict(coin) for coin in
+                    state.comparison_results[finding['name'].lower()][:5]
+                ]
+            except KeyError:
+                related_by_coin[finding['name']] = []
 
-                logger.info(f"Finished related calculation for {finding['name']}")
-                logger.info(f"Starting URL fetching for {finding['name']} related coins")
+        #
+        #  Latest messages for the found coins and all
+        #  their related coins are fetched at once.
+        #
+        names = [finding['name'] for finding in top_findings]
+        for related in related_by_coin.values():
+            names.extend(coin['name'] for coin in related)
+        names = list(dict.fromkeys(names))
 
-                name_of_related = []
-                for coin in related:
-                    name_of_related.append(coin['name'])
-                
-                logger.info(name_of_related)
-                logger.info(type(name_of_related))
+        logger.info(f"Starting URL fetching for {len(names)} coins")
+        links = dict(zip(names, self.BitcoinTalk.latest_messages(names)))
+        logger.info(f"Finished URL fetching for {len(names)} coins")
 
-                all_links = self.BitcoinTalk.latest_message(name_of_related)
+        results = []
 
-                for i,coin in enumerate(related): 
-                    coin['url'] = all_links[i]
+        logger.info(f'The length of the findings is: {len(top_findings)}')
 
-                logger.info(f"Finished URL fetching for {finding['name']} related coins")
-                
-            except KeyError:
-                related = []
+        for finding in top_findings:
+            related = related_by_coin[finding['name']]
+            for coin in related:
+                coin['url'] = links[coin['name']]
 
-            except AttributeError:
-                coin['url'] = None
-            
             results.append({
                 'title': f"See the latest conversation about {finding['name']} on bitcointalk.org",
                 'entities':[
@@ -355,7 +728,7 @@ class Crypto:
                     "name": finding['name'],
                     'start': 34,
                     'end': 34 + len(finding['name']),
-                    'url': self.BitcoinTalk.latest_message(finding['name']),
+                    'url': links[finding['name']],
                     'related': related
                     }
                 ]
@@ -364,9 +737,21 @@ class Crypto:
 
         return results
 
-    def coin_comparison(self):
+    def coin_comparison(self, limit=10, state=None):
         """
         Compares all coins in currencies to other coins based on Word2Vec similarity.
+        The similarity of every pair of coins is computed at once with a single
+        matrix multiplication over the normalized coin vectors.
+
+        Parameters
+        ----------
+        limit: int, default 10
+            Number of related coins to keep for each coin.
+
+        state: ModelState, default None
+            State whose model is used. Defaults
+            to the current state.
+
         Returns
         -------
         similar_results: Dictionary.
@@ -375,52 +760,10 @@ class Crypto:
             the related currencies to the key.
         
         """
-        logger.info(f'Running related coins with {self.model_path}')
-        similar_results = {}
-        new_list = []
-        lower_currencies = []
-        count = 0
-
-        for currency in self.currencies:
-            lower_currencies.append(currency.lower())
-
-        for currency in lower_currencies:
-            coin_dict = []
-            for cc in lower_currencies:
-                try:
-                    model_similarity = self.model.wv.similarity(currency, cc)
-                    name = [
-                        x['name'] for x in self.coins
-                        if x['name'].lower() == cc
-                    ][0]
-                    slug = [
-                        x['website_slug'] for x in self.coins
-                        if x['name'].lower() == cc
-                    ][0]
-
-                    coin_dict.append({
-                        "name": name,
-                        "slug": slug,
-                        "value": model_similarity,
-                        "url": ""
-                    })
-
-                except (KeyError, IndexError):
-                    pass
-
-            if coin_dict:
-                similar_results.update({currency: coin_dict})
-            else:
-                pass
-
-        for key, value in similar_results.items():
-            new_list.append(
-                sorted(value, key=lambda x: x['value'], reverse=True))
-            similar_results.update({key: new_list[count]})
-            count = count + 1
-
-        for value in similar_results.values():
-            del (value[0])
+        state = state or self.state
+        logger.info(f'Running related coins with {state.model_path}')
+        similar_results = related_coins(
+            getattr(state.model, 'wv', state.model), self.coins, limit=limit)
 
         logger.info('Related coins saved.')
-        return similar_results
\ No newline at end of file
+        return similar_results
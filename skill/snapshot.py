@@ -0,0 +1,102 @@
+"""
+Snapshot of the state the skill builds at startup,
+shared by all workers to avoid rebuilding it.
+"""
+import os
+import json
+import time
+import tempfile
+
+from skill.related import compact_related, expand_related
+
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot(path, coins, model_path, comparison_results, created=None):
+    """
+    Writes a snapshot of the startup state. The file
+    is replaced atomically, so workers booting at the
+    same time never read a partially written snapshot.
+
+    Parameters
+    ----------
+    path: str
+        Path to write the snapshot to.
+
+    coins: list
+        Filtered coin catalog.
+
+    model_path: str
+        Location of the model the related
+        coins table was computed with.
+
+    comparison_results: dict
+        Related coins table.
+
+    created: float, default None
+        Time the coins were fetched at, as returned by
+        time.time(). None uses the current time. The
+        age of a snapshot is measured from it.
+    """
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'created': time.time() if created is None else created,
+        'coins': coins,
+        'model_path': model_path,
+        'related': compact_related(comparison_results)
+    }
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(prefix='.snapshot-', dir=directory)
+    with os.fdopen(descriptor, 'w') as f:
+        json.dump(snapshot, f, separators=(',', ':'))
+    os.replace(temporary, path)
+
+
+def load_snapshot(path):
+    """
+    Reads a snapshot written by save_snapshot().
+
+    Parameters
+    ----------
+    path: str
+        Path to the snapshot.
+
+    Returns
+    -------
+    dict
+        Snapshot with the related coins table in the
+        format of related_coins(), or None if the file
+        is missing, unreadable or from another version.
+    """
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        return None
+
+    snapshot['related'] = expand_related(snapshot['related'])
+    return snapshot
+
+
+def is_stale(snapshot, max_age):
+    """
+    Checks if a snapshot is older than `max_age` seconds.
+
+    Parameters
+    ----------
+    snapshot: dict
+        Output from load_snapshot().
+
+    max_age: int
+        Maximum age in seconds.
+
+    Returns
+    -------
+    bool
+    """
+    return time.time() - snapshot['created'] > max_age
@@ -1,8 +1,25 @@
 import os 
+import uuid
+import threading
 import psycopg2 as postgres
 import psycopg2.extras
 
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+
+#
+#  Process-wide connection pool. It is created
+#  once per process (i.e. once per Sanic worker)
+#  and shared by all Storage() instances. The
+#  semaphore has one slot per connection, so
+#  threads wait for a free connection instead
+#  of failing when the pool is exhausted.
+#
+_pool = None
+_pool_pid = None
+_pool_slots = None
+_pool_timeout = None
+_pool_stats = {'borrowed': 0, 'returned': 0}
+_pool_stats_lock = threading.Lock()
 
 
 class Storage:
@@ -15,15 +32,116 @@ class Storage:
     ----------
     uri: str
         PostgreSQL connection string.
+
+    pool: bool, default False
+        If connections should be borrowed from the
+        process-wide connection pool instead of
+        being opened for every instance.
     """
 
     def __init__(self, uri, pool=False):
         self.uri = os.getenv('POSTGRES_URI')
         self.pool = pool
 
-        if self.pool:
-            self.connection_pool = SimpleConnectionPool(10, 10**2, self.uri)
-    
+    @classmethod
+    def create_pool(cls,
+                    minconn=int(os.getenv('POOL_MIN_CONNECTIONS', 0)),
+                    maxconn=int(os.getenv('POOL_MAX_CONNECTIONS',
+                                          int(os.getenv('EXECUTOR_THREADS', 8)) + 2)),
+                    timeout=float(os.getenv('POOL_TIMEOUT', 30))):
+        """
+        Creates the process-wide connection pool. Any
+        existing pool from the current process is closed.
+        Pools inherited from a parent process are left
+        untouched, as their connections belong to it.
+
+        No connection is opened until one is needed
+        unless `minconn` is set, so a worker starts
+        even if PostgreSQL is unavailable.
+
+        Parameters
+        ----------
+        minconn: int, default POOL_MIN_CONNECTIONS or 0
+            Minimum number of connections kept by the pool.
+
+        maxconn: int, default POOL_MAX_CONNECTIONS or EXECUTOR_THREADS + 2
+            Maximum number of connections kept by the pool.
+            Defaults to one per executor thread, plus the
+            event loop and a spare one.
+
+        timeout: float, default POOL_TIMEOUT or 30
+            Seconds to wait for a free connection when all
+            of them are in use, before raising PoolError.
+
+        Returns
+        -------
+        psycopg2.pool.ThreadedConnectionPool
+        """
+        global _pool, _pool_pid, _pool_slots, _pool_timeout
+
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+
+        _pool = ThreadedConnectionPool(minconn, maxconn, os.getenv('POSTGRES_URI'))
+        _pool_pid = os.getpid()
+        _pool_slots = threading.BoundedSemaphore(maxconn)
+        _pool_timeout = timeout
+        with _pool_stats_lock:
+            _pool_stats.update({'borrowed': 0, 'returned': 0})
+        return _pool
+
+    @classmethod
+    def close_pool(cls):
+        """
+        Closes all connections of the
+        process-wide connection pool.
+        """
+        global _pool, _pool_pid
+
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+
+        _pool = None
+        _pool_pid = None
+
+    @classmethod
+    def connection_pool(cls):
+        """
+        Returns the process-wide connection pool,
+        creating it if it doesn't exist yet
+        in the current process.
+        """
+        if _pool is None or _pool_pid != os.getpid():
+            return cls.create_pool()
+        return _pool
+
+    @classmethod
+    def pool_stats(cls):
+        """
+        Statistics of the process-wide connection pool.
+
+        Returns
+        -------
+        dict
+            Dictionary with the pool limits, the number of
+            connections in use, and the number of
+            connections borrowed and returned.
+        """
+        if _pool is None or _pool_pid != os.getpid():
+            return {'active': False}
+
+        with _pool_stats_lock:
+            borrowed = _pool_stats['borrowed']
+            returned = _pool_stats['returned']
+
+        return {
+            'active': True,
+            'min': _pool.minconn,
+            'max': _pool.maxconn,
+            'in_use': borrowed - returned,
+            'borrowed': borrowed,
+            'returned': returned
+        }
 
     def __enter__(self):
         self.open()
@@ -40,7 +158,19 @@ class Storage:
         A psycopg2 cursor.
         """
         if self.pool:
-            self.connection = self.connection_pool.getconn()
+            pool = self.connection_pool()
+            self.slots = _pool_slots
+            if not self.slots.acquire(timeout=_pool_timeout):
+                raise PoolError(f'No connection available after {_pool_timeout}s.')
+
+            try:
+                self.connection = pool.getconn()
+            except Exception:
+                self.slots.release()
+                raise
+
+            with _pool_stats_lock:
+                _pool_stats['borrowed'] += 1
         else:
             self.connection = postgres.connect(self.uri)
 
@@ -52,7 +182,8 @@ class Storage:
 
     def close(self):
         """
-        Closes connection to PostgreSQL instance.
+        Closes connection to PostgreSQL instance. Pooled
+        connections are returned to the pool instead.
         Returns
         -------
         Response from closing the connection to 
@@ -60,7 +191,11 @@ class Storage:
         """
         self.cursor.close()
         if self.pool:
-            self.connection_pool.closeall()
+            self.connection_pool().putconn(
+                self.connection, close=bool(self.connection.closed))
+            self.slots.release()
+            with _pool_stats_lock:
+                _pool_stats['returned'] += 1
             r = True
         else:
             r = self.connection.close()
@@ -98,4 +233,54 @@ class Storage:
             for row in self.cursor:
                 result.append(row)
 
-        return result
\ No newline at end of file
+        return result
+
+    def iterate(self, sql, values=None,
+                size=int(os.getenv('FETCH_SIZE', 2000)),
+                cursor_factory=psycopg2.extras.DictCursor):
+        """
+        Iterates over the rows of a SELECT query using a
+        named (server-side) cursor. Rows are fetched from
+        the server in batches of `size`, so results never
+        have to fit in memory at once.
+
+        Parameters
+        ----------
+        sql: str
+            SQL query to execute.
+
+        values: list, default None
+            Values to replace the string with.
+
+        size: int, default 2000
+            Number of rows fetched from the server
+            at a time.
+
+        cursor_factory: psycopg2 cursor class, default DictCursor
+            Cursor class used to create rows. The default
+            creates lightweight rows that can be accessed
+            both by index and by column name.
+
+        Returns
+        -------
+        Generator of rows.
+        """
+        #
+        #  Named cursors only exist inside
+        #  transactions, so autocommit is turned
+        #  off while rows are being read.
+        #
+        autocommit = self.connection.autocommit
+        self.connection.autocommit = False
+
+        cursor = self.connection.cursor(
+            name=f'storage_{uuid.uuid4().hex}', cursor_factory=cursor_factory)
+        cursor.itersize = size
+        try:
+            cursor.execute(sql, values)
+            for row in cursor:
+                yield row
+        finally:
+            cursor.close()
+            self.connection.rollback()
+            self.connection.autocommit = autocommit
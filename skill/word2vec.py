@@ -2,85 +2,311 @@
 Logic for training word2vec model.
 """
 import os
+import time
 import spacy
 import gensim
+import shutil
 import requests
+import tempfile
+import itertools
+import multiprocessing
 
 from tqdm import tqdm
 from isoweek import Week
 from sanic.log import logger
 from datetime import datetime, timedelta
+from skill.corpus import Corpus
+from skill.config import TrainingConfig, available_cores
+from skill.catalog import filter_listings
+from skill.artifacts import staging_directory, publish, checksum, vectors_path
+from skill.embeddings import CoinVectors, embeddings_path, quantization_report
 from skill.bitcointalk import BitcoinTalk
+from skill.coinmarketcap import CoinMarketCap
+from skill.related import related_coins, related_path, save_related
+
+#
+#  Version of the corpus cleaning steps. Bump it
+#  whenever cleaning changes, so that messages
+#  are tokenized again instead of being read back
+#  from the tokenized message store.
+#
+PREPROCESSING_VERSION = 1
+
+
+def load_nlp():
+    """
+    Loads the spaCy pipeline used for cleaning the corpus.
+    Only sentence boundaries and lexical attributes
+    (e.g. `is_stop`) are needed, so the tagger, parser
+    and entity recognizer are disabled and sentences
+    are split by a rule-based sentencizer.
+
+    Returns
+    -------
+    spacy.language.Language
+        spaCy pipeline.
+    """
+    nlp = spacy.load('en_core_web_sm', disable=['tagger', 'parser', 'ner'])
+    nlp.add_pipe(nlp.create_pipe('sentencizer'))
+    return nlp
+
+
+def remove_stop_words(sentence,
+                      minimum_token_length=3,
+                      minimum_sentence_length=3):
+    """
+    Removes stop words from a sentence.
+    This method also removes tokens (i.e. words)
+    that are not longer than `minimum_token_length`.
+
+    Parameters
+    ----------
+    sentence: spacy.tokens.Span
+        Sentence from a document processed by spaCy.
+
+    minimum_token_length: int, default 3
+        Tokens must be longer than this
+        to be included.
+
+    minimum_sentence_length: int, default 3
+        Minimum tokens (i.e. words) that a 
+        sentence must have.
+
+    Returns
+    -------
+    list
+        List of lower-cased words, or None if the
+        sentence is too short.
+    """
+    results = [
+        token.text.strip().lower() for token in sentence
+        if not token.is_stop and len(token.text) > minimum_token_length
+    ]
+
+    if len(results) < minimum_sentence_length:
+        return None
+    else:
+        return results
+
+
+def clean_documents(nlp, texts, batch_size=1000):
+    """
+    Splits documents into sentences and removes their stop
+    words. Documents are processed in batches with `nlp.pipe`.
+
+    Parameters
+    ----------
+    nlp: spacy.language.Language
+        Pipeline from load_nlp().
+
+    texts: iterable
+        Iterable of document strings.
+
+    batch_size: int, default 1000
+        Number of documents processed per batch.
+
+    Returns
+    -------
+    generator
+        Generator with one list of sentences per document.
+        Each sentence is a list of words (str).
+    """
+    texts = (text or '' for text in texts)
+    for doc in nlp.pipe(texts, batch_size=batch_size):
+        sentences = []
+        for sentence in doc.sents:
+            words = remove_stop_words(
+                sentence,
+                minimum_token_length=2,
+                minimum_sentence_length=3)
+            if words:
+                sentences.append(words)
+        yield sentences
+
+
+def shards(iterable, size):
+    """
+    Splits an iterable into lists of at most `size`
+    items, without reading it all into memory.
+    """
+    iterator = iter(iterable)
+    while True:
+        shard = list(itertools.islice(iterator, size))
+        if not shard:
+            return
+        yield shard
+
+
+#
+#  spaCy pipeline of a corpus worker process.
+#  Every worker loads its own pipeline once.
+#
+_worker_nlp = None
+
+
+def _initialize_worker():
+    """
+    Loads the spaCy pipeline of a worker process.
+    """
+    global _worker_nlp
+    _worker_nlp = load_nlp()
+
+
+def _clean_shard(arguments, nlp=None):
+    """
+    Cleans a shard of documents and writes its sentences
+    to a shard file, one sentence per line with words
+    separated by spaces. If a preprocessing version is
+    given, the sentences of every document are also saved
+    to the tokenized message store.
+
+    Parameters
+    ----------
+    arguments: tuple
+        Shard file path, list of (sid, document string)
+        tuples, spaCy batch size and preprocessing version
+        (or None).
+
+    nlp: spacy.language.Language, default None
+        Pipeline to use. Defaults to the pipeline
+        of the worker process.
+
+    Returns
+    -------
+    tuple
+        Shard file path and number of documents.
+    """
+    path, documents, batch_size, version = arguments
+    nlp = nlp or _worker_nlp
+
+    sids = [sid for sid, _ in documents]
+    texts = [text for _, text in documents]
+
+    records = []
+    with open(path, 'w') as f:
+        cleaned = clean_documents(nlp, texts, batch_size)
+        for sid, sentences in zip(sids, cleaned):
+            lines = '\n'.join(' '.join(words) for words in sentences)
+            if lines:
+                f.write(lines + '\n')
+            records.append((sid, lines))
+
+    if version is not None:
+        BitcoinTalk().save_tokens(records, version)
+
+    return path, len(documents)
+
+
+def coin_similarity_score(model, pairs):
+    """
+    Coin similarity score of a model: the mean
+    similarity between pairs of coins known to be
+    related. The coins are part of the training
+    data, so the score measures convergence rather
+    than how well the model generalises.
+
+    Parameters
+    ----------
+    model: gensim.models.Word2Vec
+        Model to evaluate.
+
+    pairs: list
+        List of pairs of lower-cased coin names.
+
+    Returns
+    -------
+    float
+        Mean similarity of the pairs found in the
+        vocabulary, or None if none was found.
+    """
+    similarities = [
+        model.wv.similarity(a, b) for a, b in pairs
+        if a in model.wv.vocab and b in model.wv.vocab
+    ]
+    if not similarities:
+        return None
+    return float(sum(similarities) / len(similarities))
 
 
 class Model:
     """
     This class sets up the Word2Vec model on the BitcoinTalk data. It cleans 
     the data by creating sentences and removing stop words, creates the corpus, 
-    and then runs this data in a Word2Vec model with 4000 epochs.
+    and then runs this data in a Word2Vec model configured by TrainingConfig.
     """
 
     def __init__(self):
-        self.nlp = spacy.load('en_core_web_sm')
-        self.last_week = BitcoinTalk().last_week()
+        self.nlp = load_nlp()
 
-    def __create_sentences(self, document):
+    def __clean_in_shards(self, documents, batch_size, workers,
+                          shard_size, version, directory, write_corpus):
         """
-        This function creates sentences using the spacy library.
-
-        Parameters
-        ----------
-        document: str 
-            Any large string will be split into sentences. 
+        Cleans documents in shards that are written to shard files,
+        which are then merged into a single corpus file. With more
+        than one worker, shards are cleaned in a pool of worker
+        processes. Shard files are removed once merged, or right
+        away if no corpus file is written.
 
         Returns
         -------
-        list
-            List with split sentences.
+        tuple
+            Path to the merged corpus file (None if it was
+            not written) and number of documents cleaned.
         """
-        doc = self.nlp(document)
-        return [sentence.text for sentence in doc.sents]
+        count = 0
+        paths = []
+        arguments = (
+            (os.path.join(directory, f'shard-{i:06d}.txt'), shard, batch_size, version)
+            for i, shard in enumerate(shards(documents, shard_size)))
 
-    def __remove_stop_words(self,
-                            document,
-                            minimum_token_length=3,
-                            minimum_sentence_length=3):
-        """
-        Removes stop words from an input document.
-        This method also removes tokens (i.e. words)
-        that contain a single character.
-        
-        Parameters
-        ----------
-        document: str
-            Text string representing a document.
-        
-        minimum_token_length: int, default 3
-            Minimum token length for a token
-            to be included.
-        
-        minimum_sentence_length: int, default 2
-            Minimum tokens (i.e. words) that a 
-            sentence must have.
-        
-        Returns
-        -------
-        str
-            String without stop words. Words are separated
-            by a space (i.e. ' ').
-        """
-        doc = self.nlp(document)
-        results = [
-            token.text.strip() for token in doc
-            if not token.is_stop and len(token.text) > minimum_token_length
-        ]
-
-        if len(results) < minimum_sentence_length:
-            return None
+        if workers > 1:
+            pool = multiprocessing.Pool(workers, initializer=_initialize_worker)
+            clean = pool.map
         else:
-            return results
+            pool = None
+            clean = lambda function, wave: [function(a, nlp=self.nlp) for a in wave]
+
+        try:
+            #
+            #  Shards are sent in waves of one shard per
+            #  worker, so that only a few shards are held
+            #  in memory at a time.
+            #
+            while True:
+                wave = list(itertools.islice(arguments, max(workers, 1)))
+                if not wave:
+                    break
 
-    def _corpus_create(self, documents):
+                for path, n in clean(_clean_shard, wave):
+                    paths.append(path)
+                    count += n
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+        if not write_corpus:
+            for path in paths:
+                os.remove(path)
+            return None, count
+
+        corpus_path = os.path.join(directory, 'corpus.txt')
+        with open(corpus_path, 'w') as corpus:
+            for path in paths:
+                with open(path) as shard:
+                    shutil.copyfileobj(shard, corpus)
+                os.remove(path)
+
+        return corpus_path, count
+
+    def _corpus_create(self,
+                       documents,
+                       directory,
+                       batch_size=1000,
+                       workers=int(os.getenv('CORPUS_WORKERS', available_cores())),
+                       shard_size=5000,
+                       version=None,
+                       write_corpus=True):
         """
         This function creates a corpus that is cleaned from the PostgreSQL 
         database. It removes all stop words and shorter sentences, and 
@@ -88,14 +314,42 @@ class Model:
 
         Parameters
         ----------
-        documents: list
-            List of documents extracted from Bitcointalk().last_week()
+        documents: iterable
+            Documents extracted from Bitcointalk().last_week()
+
+        directory: str
+            Directory where the corpus file is written.
+            It is owned by the caller, who removes it
+            once the corpus is no longer needed.
+
+        batch_size: int, default 1000
+            Number of documents processed by spaCy per batch.
+
+        workers: int, default number of available cores
+            Number of worker processes. Each worker loads its
+            own spaCy pipeline and cleans shards of documents.
+            With a single worker, documents are cleaned in
+            this process instead.
+
+        shard_size: int, default 5000
+            Number of documents per shard.
+
+        version: int, default None
+            If given, the sentences of every document are also
+            saved to the tokenized message store under this
+            preprocessing version.
+
+        write_corpus: bool, default True
+            If the corpus file should be written. When
+            only the tokenized message store is being
+            filled, it is not needed.
 
         Returns
         -------
-        results: list
-            Contains a corpus that can be directed used to 
-            train Word2Vec model. A corpus is a list of sentences.
+        results: Corpus
+            None if `write_corpus` is False. Otherwise, contains a corpus that can be directed used to 
+            train Word2Vec model. A corpus is a restartable
+            iterable of sentences streamed from disk.
             And a sentence is a list of words (str). Example:
 
                 [
@@ -103,31 +357,98 @@ class Model:
                     ['ethereum', 'prices', 'slow', 'down']
                 ]
         """
-        logger.info("Cleaning Corpus...")
-
-        results = []
-        for document in documents:
-            sentences = self.__create_sentences(
-                document['content_no_quote_no_html'])
-            for sentence in sentences:
-                sentences_no_stop_words = self.__remove_stop_words(
-                    sentence,
-                    minimum_token_length=2,
-                    minimum_sentence_length=3)
-            if sentences_no_stop_words:
-                results.append(sentences_no_stop_words)
-        lower_case = []
-        for result in results:
-            mapped = map(str.lower, result)
-            lower_case.append(list(mapped))
-
-        logger.info("Corpus Cleaned!")
-        return lower_case
+        logger.info(f"Cleaning Corpus with {workers} worker(s)...")
+
+        start = time.time()
+        documents = (
+            (document['sid'], document['content_no_quote_no_html'])
+            for document in documents)
+
+        corpus_path, count = self.__clean_in_shards(
+            documents, batch_size, workers, shard_size, version, directory,
+            write_corpus)
+        results = Corpus(corpus_path) if corpus_path else None
+
+        elapsed = time.time() - start
+        logger.info(
+            f"Corpus Cleaned! {count} documents in {elapsed:.1f}s "
+            f"({count / max(elapsed, 1e-9):.1f} docs/sec)")
+        return results
+
+    def _fit(self, corpus, config):
+        """
+        Trains a Word2Vec model one epoch at a time, with the
+        learning rate decaying linearly across all epochs. The
+        throughput of every epoch is logged in words/sec. The
+        coin similarity score is evaluated every
+        `config.evaluate_every` epochs, and training stops early
+        once it has not improved for `config.patience` evaluations.
+
+        Parameters
+        ----------
+        corpus: iterable
+            Restartable iterable of sentences.
+
+        config: TrainingConfig
+            Training settings.
+
+        Returns
+        -------
+        model: gensim.models.Word2Vec
+            Trained Gensim Word2Vec model.
+        """
+        model = gensim.models.Word2Vec(**config.word2vec_kwargs())
+        model.build_vocab(corpus)
+
+        alpha, min_alpha = model.alpha, model.min_alpha
+        decay = (alpha - min_alpha) / config.epochs
+
+        best = None
+        stale = 0
+        for epoch in range(config.epochs):
+            start = time.time()
+            _, words = model.train(
+                corpus,
+                total_examples=model.corpus_count,
+                epochs=1,
+                start_alpha=alpha - decay * epoch,
+                end_alpha=alpha - decay * (epoch + 1))
+            elapsed = time.time() - start
+
+            logger.info(
+                f'Epoch {epoch + 1}/{config.epochs}: '
+                f'{words / max(elapsed, 1e-9):.0f} words/sec')
+
+            if (epoch + 1) % config.evaluate_every:
+                continue
+
+            score = coin_similarity_score(model, config.evaluation_pairs)
+            if score is None:
+                continue
+
+            logger.info(f'Coin similarity: {score:.4f}')
+            if best is None or score > best + config.min_delta:
+                best = score
+                stale = 0
+            else:
+                stale += 1
+
+            if stale >= config.patience:
+                logger.info(f'Score plateaued. Stopping after epoch {epoch + 1}.')
+                break
+
+        return model
 
     def train(self,
               data_last_week=True,
-              epochs=4000,
+              epochs=None,
               directory=os.getenv('MODELS_PATH'), 
+              related_limit=10,
+              corpus_workers=int(os.getenv('CORPUS_WORKERS', available_cores())),
+              incremental=True,
+              corpus_directory=os.getenv('CORPUS_PATH'),
+              config=None,
+              embeddings_dtype=os.getenv('EMBEDDINGS_DTYPE', 'float32'),
               **kwargs):
         """
         This functions trains a Word2Vec model on the last week data from BitcoinTalk.
@@ -136,34 +457,143 @@ class Model:
 
         Parameters
         ----------
-        epochs: int, default 4000
-            Number of epochs to train model for.
+        epochs: int, default None
+            Maximum number of epochs to train model for.
+            Overrides the value from `config`.
         
         directory: str, default 'models'
             Directory to store trained models.
 
+        related_limit: int, default 10
+            Number of related coins saved for each coin
+            in the related coins table written next to
+            the model.
+
+        corpus_workers: int, default number of available cores
+            Number of processes used for cleaning the corpus.
+
+        incremental: bool, default True
+            If only messages missing from the tokenized
+            message store should be cleaned. All other
+            messages are read back from the store.
+
+        corpus_directory: str, default None
+            Directory for the temporary corpus files that are
+            streamed during training. The system temporary
+            directory is used if None.
+
+        embeddings_dtype: str, default 'float32'
+            Type of the coin embeddings matrix exported
+            for serving: 'float32', 'float16' or 'int8'.
+
+        config: TrainingConfig, default None
+            Training settings. Loaded from the environment
+            and the `W2V_CONFIG` file if None.
+
+        **kwargs:
+            Training settings that override the ones
+            from `config` (e.g. `min_count=1`).
+
         Returns
         -------
         model: gensim.models.Word2Vec
             Trained Gensim Word2Vec model.
         """
+        training_start = time.time()
+        if config is None:
+            config = TrainingConfig.load()
+
+        settings = config.as_dict()
+        settings.update(kwargs)
+        if epochs is not None:
+            settings['epochs'] = epochs
+        config = TrainingConfig(**settings)
+        logger.info(f'Training with {config}')
+
+        bitcointalk = BitcoinTalk()
         if data_last_week:
-            data = self.last_week
+            start, stop = bitcointalk.monday_last_week, bitcointalk.sunday_last_week
         else:
-            data = BitcoinTalk().all()
+            start, stop = None, None
 
         last_week = str(Week.thisweek() - 1)
 
         print("Training pipeline beginning!!")
         logger.info(f'Getting last weeks data ({last_week})')
-        cleaned_data = self._corpus_create(data)
+        with tempfile.TemporaryDirectory(dir=corpus_directory) as temporary:
+            if incremental:
+                data = bitcointalk.untokenized(PREPROCESSING_VERSION, start, stop)
+                self._corpus_create(
+                    data, temporary, workers=corpus_workers,
+                    version=PREPROCESSING_VERSION, write_corpus=False)
+
+                logger.info('Reading corpus from the tokenized message store.')
+                cleaned_data = Corpus.write(
+                    bitcointalk.tokenized(PREPROCESSING_VERSION, start, stop),
+                    os.path.join(temporary, 'tokenized.txt'))
+            elif data_last_week:
+                cleaned_data = self._corpus_create(
+                    bitcointalk.last_week(), temporary, workers=corpus_workers)
+            else:
+                cleaned_data = self._corpus_create(
+                    bitcointalk.all(), temporary, workers=corpus_workers)
 
-        logger.info('Training Model.')
-        model = gensim.models.Word2Vec(cleaned_data, iter=epochs, **kwargs)
-        logger.info('Model trained!')
+            logger.info('Training Model.')
+            model = self._fit(cleaned_data, config)
+            logger.info('Model trained!')
+
+        #
+        #  Artifacts are written to a staging directory
+        #  and only published, with their manifest, once
+        #  all of them are complete.
+        #
+        staging = staging_directory(directory)
 
         logger.info('Saving model to directory models.')
-        model.save(f'{directory}/{last_week}.model')
+        model_name = f'{last_week}.model'
+        model_path = os.path.join(staging, model_name)
+        model.save(model_path)
+
+        #
+        #  The server only needs the word vectors. They
+        #  are exported with their array in a separate
+        #  file so that every worker can memory-map it
+        #  and share a single copy in the page cache.
+        #
+        logger.info('Saving serving vectors.')
+        model.wv.save(vectors_path(model_path), separately=['vectors'])
+
+        logger.info('Saving related coins table.')
+        coins = filter_listings(CoinMarketCap.listings())
+        related = related_coins(model.wv, coins, limit=related_limit)
+        save_related(related, related_path(model_path))
+
+        #
+        #  The API only compares coins with each other,
+        #  so their vectors alone are enough for serving.
+        #  How much smaller types change the related
+        #  coins is reported in the manifest.
+        #
+        logger.info('Saving coin embeddings.')
+        embeddings = CoinVectors.from_vectors(model.wv, coins)
+        report = quantization_report(embeddings, coins, limit=related_limit)
+        for dtype, result in report.items():
+            logger.info(f"{dtype}: {result['bytes']} bytes, "
+                        f"{result['overlap']:.1%} related coins overlap")
+        embeddings.quantize(embeddings_dtype).save(embeddings_path(model_path))
+
+        manifest = publish(staging, directory, {
+            'week': last_week,
+            'model': model_name,
+            'vectors': os.path.basename(vectors_path(model_path)),
+            'embeddings': os.path.basename(embeddings_path(model_path)),
+            'embeddings_dtype': embeddings_dtype,
+            'quantization': report,
+            'corpus_size': model.corpus_count,
+            'training_time': round(time.time() - training_start, 1),
+            'checksum': checksum(model_path)
+        })
+        logger.info(f"Published {manifest['model']} to {directory}")
         logger.info('Done!')
         print("Done training!!")
 
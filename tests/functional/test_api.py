@@ -5,7 +5,9 @@ Tests for the API.
 import json
 import plotly
 import unittest
+import threading
 
+from unittest import mock
 from tests.data import article_data
 from skill.api.server import Server
 
@@ -91,4 +93,73 @@ class CryptoTestCase(unittest.TestCase):
         """
         _, response = self.server.post('/detect?text=foo')
         self.assertTrue(response.status == 400)
-    
\ No newline at end of file
+    
+    def test_stats_reports_connection_pool(self):
+        """
+        /stats reports the connection pool of the worker.
+        """
+        _, response = self.server.get('/stats')
+        self.assertTrue(response.json.get('success'))
+        self.assertIn('pool', response.json.keys())
+
+    def test_detect_rejects_unknown_week(self):
+        """
+        /detect returns 400 for a week without a model.
+        """
+        data = {'text': 'Bitcoin', 'week': '1999W01'}
+        _, response = self.server.post('/detect', data=json.dumps(data))
+        self.assertTrue(response.status == 400)
+
+    def test_detect_rejects_numeric_week(self):
+        """
+        /detect returns 400 for a week that is not a string.
+        """
+        data = {'text': 'Bitcoin', 'week': 201832}
+        _, response = self.server.post('/detect', data=json.dumps(data))
+        self.assertTrue(response.status == 400)
+
+
+class ExecutorTestCase(unittest.TestCase):
+    """
+    Test case for the thread pool that runs blocking calls.
+    """
+    def setUp(self):
+        self.threads = []
+
+        def text(**kwargs):
+            self.threads.append(threading.current_thread())
+            return []
+
+        #
+        #  The skill is replaced, so that only the
+        #  thread running its calls is observed.
+        #
+        patch = mock.patch('skill.api.routes.Crypto')
+        crypto = patch.start()
+        self.addCleanup(patch.stop)
+        crypto.return_value.text.side_effect = text
+
+        self.app = Server(debug=False).app
+
+    def test_blocking_calls_run_on_executor(self):
+        """
+        /detect runs the skill on a thread of the executor.
+        """
+        data = {'text': 'Bitcoin'}
+        _, response = self.app.test_client.post('/detect', data=json.dumps(data))
+
+        self.assertTrue(response.json.get('success'))
+        self.assertEqual(len(self.threads), 1)
+        self.assertIsNot(self.threads[0], threading.main_thread())
+        self.assertTrue(self.threads[0].name.startswith('ThreadPoolExecutor'))
+        self.assertEqual(self.app.executor_stats['submitted'], 1)
+        self.assertEqual(self.app.executor_stats['completed'], 1)
+
+    def test_executor_shuts_down_with_server(self):
+        """
+        The executor is shut down when the server stops.
+        """
+        self.app.test_client.get('/status')
+
+        with self.assertRaises(RuntimeError):
+            self.app.executor.submit(print)
@@ -0,0 +1,98 @@
+"""
+Unit tests for publishing model artifacts.
+"""
+import os
+import tempfile
+import unittest
+
+from skill.artifacts import (staging_directory, publish, read_manifest,
+                             published_path, checksum, vectors_path)
+
+
+class ArtifactsTestCase(unittest.TestCase):
+    """
+    Test case for the artifacts module.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def publish_model(self, content):
+        """
+        Stages and publishes a model file.
+        """
+        staging = staging_directory(self.directory.name)
+        with open(os.path.join(staging, '2018W32.model'), 'w') as f:
+            f.write(content)
+
+        manifest = publish(staging, self.directory.name, {
+            'week': '2018W32', 'model': '2018W32.model'})
+        self.assertFalse(os.path.exists(staging))
+        return manifest
+
+    def test_publish_moves_files_and_writes_manifest(self):
+        """
+        publish() moves staged files to a version directory
+        and lists them in the manifest.
+        """
+        written = self.publish_model('model')
+
+        manifest = read_manifest(self.directory.name)
+        self.assertEqual(manifest, written)
+        self.assertEqual(manifest['week'], '2018W32')
+        self.assertEqual(manifest['model'],
+                         os.path.join(manifest['version'], '2018W32.model'))
+        self.assertEqual(manifest['files'], [manifest['model']])
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.directory.name, manifest['model'])))
+
+    def test_publish_keeps_earlier_versions(self):
+        """
+        publish() leaves the files of the previous manifest untouched.
+        """
+        first = self.publish_model('first')
+        second = self.publish_model('second')
+
+        self.assertNotEqual(first['model'], second['model'])
+        self.assertEqual(read_manifest(self.directory.name), second)
+        with open(os.path.join(self.directory.name, first['model'])) as f:
+            self.assertEqual(f.read(), 'first')
+        self.assertEqual(
+            published_path(self.directory.name, '2018W32.model'),
+            os.path.join(self.directory.name, second['model']))
+
+    def test_published_path_falls_back_to_directory(self):
+        """
+        published_path() returns a path directly inside the
+        directory for files that were never published.
+        """
+        self.assertEqual(
+            published_path(self.directory.name, '2018W31.model'),
+            os.path.join(self.directory.name, '2018W31.model'))
+
+    def test_missing_manifest_returns_none(self):
+        """
+        read_manifest() returns None if there is no manifest.
+        """
+        self.assertIsNone(read_manifest(self.directory.name))
+
+    def test_checksum_is_sha256(self):
+        """
+        checksum() returns the SHA-256 digest of a file.
+        """
+        path = os.path.join(self.directory.name, 'file')
+        with open(path, 'w') as f:
+            f.write('model')
+
+        self.assertEqual(
+            checksum(path),
+            'sha256:9372c470eeadd5ecd9c3c74c2b3cb633f8e2f2fad799250a0f70d652b6b825e4')
+
+    def test_vectors_path_replaces_extension(self):
+        """
+        vectors_path() places the serving vectors next to the model.
+        """
+        self.assertEqual(
+            vectors_path('models/2018W32.model'), 'models/2018W32.kv')
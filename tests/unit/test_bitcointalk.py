@@ -0,0 +1,234 @@
+"""
+Unit tests for the BitcoinTalk class.
+"""
+import os
+import sys
+import unittest
+
+from skill import bitcointalk
+from skill.storage import Storage
+from skill.bitcointalk import BitcoinTalk
+
+
+#
+#  Messages and coins are made up, so that other
+#  rows in the test database never match them.
+#
+MESSAGES = [
+    (-101, '2018-08-01 10:00', 'link-101', 'Zzyzxcoin is rising'),
+    (-102, '2018-08-02 10:00', 'link-102', 'I sold my Zzyzxcoin for Quuxcash Gold'),
+    (-103, '2018-08-03 10:00', 'link-103', "Plugh's Token launched today")
+]
+COINS = ['Zzyzxcoin', 'Quuxcash Gold', "Plugh's Token", 'Xyzzynothing']
+SIDS = (-199, -101)
+SCRAPER_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'skill-scraper')
+
+
+def insert_messages(messages):
+    """
+    Inserts messages with their full-text search vector.
+    """
+    with Storage(os.getenv('POSTGRES_URI')) as S:
+        for sid, post_time, link, content in messages:
+            S.execute("""
+                INSERT INTO message (sid, post_time, link, content_no_quote_no_html, content_tsv)
+                    VALUES (%s, %s, %s, %s, to_tsvector('english', %s))
+                """, [sid, post_time, link, content, content])
+
+
+def delete_test_rows():
+    """
+    Deletes the messages and coins used by the tests.
+    """
+    with Storage(os.getenv('POSTGRES_URI')) as S:
+        S.execute("DELETE FROM message WHERE sid BETWEEN %s AND %s", list(SIDS))
+        S.execute("DELETE FROM coin_latest_mention WHERE coin = ANY(%s)", [COINS])
+        S.execute("DELETE FROM coin WHERE name = ANY(%s)", [COINS])
+
+
+def catalog(names):
+    """
+    Coin dictionaries in the format of CoinMarketCap.listings().
+    """
+    return [{
+        'name': name,
+        'symbol': name[:3].upper(),
+        'website_slug': name.lower().replace(' ', '-')
+    } for name in names]
+
+
+def latest_mentions():
+    """
+    Links of the latest mentions of the test coins.
+    """
+    with Storage(os.getenv('POSTGRES_URI')) as S:
+        rows = S.execute("""
+            SELECT coin, link FROM coin_latest_mention WHERE coin = ANY(%s)
+            """, [COINS])
+
+    return {row['coin']: row['link'] for row in rows}
+
+
+def search_latest_message(coin):
+    """
+    Latest message that mentions a coin, searched
+    one coin at a time over the message content, as
+    BitcoinTalk().latest_message() used to.
+    """
+    with Storage(os.getenv('POSTGRES_URI')) as S:
+        rows = S.execute("""
+            SELECT
+                link
+            FROM message
+            WHERE to_tsvector('english', content_no_quote_no_html) @@
+                  phraseto_tsquery('english', %s)
+                ORDER BY post_time DESC
+                LIMIT 1
+            """, [coin])
+
+    return rows[0]['link'] if rows else None
+
+
+class LatestMessagesTestCase(unittest.TestCase):
+    """
+    Test case for BitcoinTalk().latest_messages().
+    """
+    def setUp(self):
+        bitcointalk.store.clear()
+        delete_test_rows()
+        insert_messages(MESSAGES)
+        self.bitcointalk = BitcoinTalk()
+
+    def tearDown(self):
+        delete_test_rows()
+
+    def test_unindexed_coins_match_per_coin_search(self):
+        """
+        BitcoinTalk().latest_messages() searches coins without a latest
+        mention like the per-coin search does.
+        """
+        links = self.bitcointalk.latest_messages(COINS)
+
+        self.assertEqual(links, [search_latest_message(coin) for coin in COINS])
+        self.assertEqual(links, ['link-102', 'link-102', 'link-103', None])
+
+    def test_indexed_coins_read_latest_mentions(self):
+        """
+        BitcoinTalk().latest_messages() reads the latest mention of
+        indexed coins instead of searching for them.
+        """
+        with Storage(os.getenv('POSTGRES_URI')) as S:
+            S.execute("""
+                INSERT INTO coin_latest_mention (coin, message_sid, link, post_time)
+                    VALUES ('Zzyzxcoin', -101, 'link-indexed', '2018-08-01 10:00')
+                """)
+
+        links = self.bitcointalk.latest_messages(COINS)
+        self.assertEqual(links, ['link-indexed', 'link-102', 'link-103', None])
+
+    def test_single_coin_returns_link(self):
+        """
+        BitcoinTalk().latest_message() returns the link of one coin.
+        """
+        self.assertEqual(self.bitcointalk.latest_message("Plugh's Token"), 'link-103')
+        self.assertEqual(self.bitcointalk.latest_messages([]), [])
+
+
+class CoinCatalogTestCase(unittest.TestCase):
+    """
+    Test case for the coin catalog kept by BitcoinTalk() and the scraper.
+    """
+    @classmethod
+    def setUpClass(cls):
+        sys.path.insert(0, SCRAPER_PATH)
+        try:
+            import pg
+        finally:
+            sys.path.remove(SCRAPER_PATH)
+        cls.pg = pg
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.pg.conn is not None:
+            cls.pg.conn.close()
+            cls.pg.conn = None
+
+    def setUp(self):
+        delete_test_rows()
+        insert_messages(MESSAGES)
+        self.bitcointalk = BitcoinTalk()
+
+    def tearDown(self):
+        delete_test_rows()
+
+    def test_saved_coins_are_updated(self):
+        """
+        BitcoinTalk().save_coins() adds new coins and updates existing ones.
+        """
+        coins = catalog(COINS)
+        self.bitcointalk.save_coins(coins)
+        coins[0]['symbol'] = 'ZZY'
+        self.bitcointalk.save_coins(coins)
+
+        with Storage(os.getenv('POSTGRES_URI')) as S:
+            rows = S.execute("""
+                SELECT name, symbol FROM coin WHERE name = ANY(%s)
+                """, [COINS])
+        symbols = {row['name']: row['symbol'] for row in rows}
+        self.assertEqual(len(symbols), len(COINS))
+        self.assertEqual(symbols['Zzyzxcoin'], 'ZZY')
+
+    def test_new_coins_get_their_latest_mention(self):
+        """
+        BitcoinTalk().save_coins() searches the latest mention of new coins only.
+        """
+        with Storage(os.getenv('POSTGRES_URI')) as S:
+            S.execute("""
+                INSERT INTO coin_latest_mention (coin, message_sid, link, post_time)
+                    VALUES ('Zzyzxcoin', -101, 'link-indexed', '2018-08-01 10:00')
+                """)
+
+        self.assertEqual(self.bitcointalk.save_coins(catalog(COINS)), 3)
+        self.assertEqual(latest_mentions(), {
+            'Zzyzxcoin': 'link-indexed',
+            'Quuxcash Gold': 'link-102',
+            "Plugh's Token": 'link-103',
+            'Xyzzynothing': None
+        })
+        self.assertEqual(self.bitcointalk.save_coins(catalog(COINS)), 0)
+
+    def test_unlisted_coins_are_pruned(self):
+        """
+        BitcoinTalk().prune_coins() removes coins missing from the catalog.
+        """
+        self.bitcointalk.save_coins(catalog(COINS))
+        with Storage(os.getenv('POSTGRES_URI')) as S:
+            names = [row['name'] for row in S.execute('SELECT name FROM coin')]
+
+        listed = [name for name in names if name != 'Xyzzynothing']
+        self.assertEqual(self.bitcointalk.prune_coins(catalog(listed)), 1)
+        self.assertNotIn('Xyzzynothing', latest_mentions())
+        self.assertEqual(self.bitcointalk.prune_coins([]), 0)
+
+    def test_scraper_keeps_latest_mentions_current(self):
+        """
+        The scraper updates latest mentions with newer messages only.
+        """
+        self.bitcointalk.save_coins(catalog(COINS))
+        self.pg.insertMessages([{
+            'id': -104,
+            'post_time': '2018-08-04 10:00',
+            'link': 'link-104',
+            'content_no_quote_no_html': 'Xyzzynothing beats Zzyzxcoin'
+        }, {
+            'id': -105,
+            'post_time': '2018-07-01 10:00',
+            'link': 'link-105',
+            'content_no_quote_no_html': "Plugh's Token was announced"
+        }])
+
+        mentions = latest_mentions()
+        self.assertEqual(mentions['Xyzzynothing'], 'link-104')
+        self.assertEqual(mentions['Zzyzxcoin'], 'link-104')
+        self.assertEqual(mentions["Plugh's Token"], 'link-103')
@@ -0,0 +1,70 @@
+"""
+Unit tests for the weekly model cache.
+"""
+import unittest
+
+from skill.cache import ModelCache
+
+
+class State:
+    """
+    Minimal model state for testing.
+    """
+    def __init__(self, week):
+        self.model_path = f'{week}.model'
+        self.comparison_results = {'bitcoin': [{'name': 'Litecoin'}] * 10}
+        self._model = None
+
+
+class ModelCacheTestCase(unittest.TestCase):
+    """
+    Test case for the ModelCache class.
+    """
+    def setUp(self):
+        self.loaded = []
+
+        def loader(week):
+            self.loaded.append(week)
+            return State(week)
+
+        self.loader = loader
+
+    def test_cached_weeks_are_not_loaded_again(self):
+        """
+        ModelCache().get() only loads a week once.
+        """
+        cache = ModelCache(self.loader)
+        first = cache.get('2018W31')
+        second = cache.get('2018W31')
+
+        self.assertIs(first, second)
+        self.assertEqual(self.loaded, ['2018W31'])
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_least_recently_used_week_is_evicted(self):
+        """
+        ModelCache().get() evicts the least recently used week
+        when over budget.
+        """
+        cache = ModelCache(self.loader, budget=1)
+        cache.get('2018W30')
+        cache.get('2018W31')
+
+        stats = cache.stats()
+        self.assertEqual(stats['weeks'], ['2018W31'])
+        self.assertEqual(stats['evictions'], 1)
+
+    def test_recently_used_week_is_kept(self):
+        """
+        ModelCache().get() keeps weeks that were accessed recently.
+        """
+        cache = ModelCache(self.loader)
+        cache.get('2018W30')
+        cache.budget = cache.nbytes * 2
+
+        cache.get('2018W31')
+        cache.get('2018W30')
+        cache.get('2018W32')
+
+        self.assertEqual(cache.stats()['weeks'], ['2018W30', '2018W32'])
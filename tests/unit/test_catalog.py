@@ -0,0 +1,101 @@
+"""
+Unit tests for the coin catalog.
+"""
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+from skill import catalog
+from skill.catalog import (CoinIndex, filter_listings, load_lexicon,
+                           save_lexicon, UNDESIRABLE_COINS)
+
+
+class CatalogTestCase(unittest.TestCase):
+    """
+    Test case for the catalog functions.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'lexicon.json')
+        self.coins = [
+            {'name': 'Bitcoin'},
+            {'name': 'Gold'},
+            {'name': 'Crypto'},
+            {'name': 'Fluttercoin'}
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_ambiguous_and_undesirable_coins_are_removed(self):
+        """
+        filter_listings() removes English words and undesirable coins.
+        """
+        with mock.patch.object(catalog, 'ambiguous_names',
+                               return_value=['Gold']):
+            coins = filter_listings(self.coins, lexicon_path=self.path)
+
+        self.assertEqual(
+            [coin['name'] for coin in coins], ['Bitcoin', 'Fluttercoin'])
+
+    def test_lexicon_is_reused_for_same_listings(self):
+        """
+        filter_listings() only looks up names missing from the lexicon.
+        """
+        with mock.patch.object(catalog, 'ambiguous_names',
+                               return_value=['Gold']) as lookup:
+            filter_listings(self.coins, lexicon_path=self.path)
+            filter_listings(self.coins, lexicon_path=self.path)
+            filter_listings(self.coins + [{'name': 'Monero'}],
+                            lexicon_path=self.path)
+
+        self.assertEqual(lookup.call_count, 2)
+        self.assertEqual(lookup.call_args[0][0], ['Monero'])
+
+    def test_saved_lexicon_loads_with_same_content(self):
+        """
+        load_lexicon() returns the lexicon written by save_lexicon().
+        """
+        lexicon = {
+            'checked': {'Bitcoin', 'Gold'},
+            'ambiguous': {'Gold'},
+            'undesirable': set(UNDESIRABLE_COINS)
+        }
+        save_lexicon(self.path, lexicon)
+        self.assertEqual(load_lexicon(self.path), lexicon)
+
+
+class CoinIndexTestCase(unittest.TestCase):
+    """
+    Test case for the CoinIndex class.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.index = CoinIndex([
+            {'id': 1, 'name': 'Bitcoin', 'symbol': 'BTC', 'website_slug': 'bitcoin'},
+            {'id': 2, 'name': 'Litecoin', 'symbol': 'LTC', 'website_slug': 'litecoin'},
+            {'id': 3, 'name': 'Litecoin Cash', 'symbol': 'LTC', 'website_slug': 'litecoin-cash'}
+        ])
+
+    def test_find_by_id_and_slug(self):
+        """
+        CoinIndex().find() finds coins by id or slug.
+        """
+        self.assertEqual(self.index.find(2)['website_slug'], 'litecoin')
+        self.assertEqual(self.index.find('bitcoin')['id'], 1)
+        self.assertIsNone(self.index.find('foo'))
+
+    def test_lookup_by_name_and_symbol(self):
+        """
+        CoinIndex() indexes lower-cased names and all coins of a symbol.
+        """
+        self.assertEqual(self.index.by_name['litecoin cash']['id'], 3)
+        self.assertEqual([c['id'] for c in self.index.by_symbol['LTC']], [2, 3])
+
+    def test_ranks_follow_listing_order(self):
+        """
+        CoinIndex() ranks coin ids by their position in the list.
+        """
+        self.assertEqual(self.index.ranks, {1: 0, 2: 1, 3: 2})
@@ -2,9 +2,14 @@
 """
 Tests for the Crypto class.
 """
+import psycopg2
+import requests
 import unittest
 
-from datetime import datetime
+from unittest import mock
+from datetime import date, datetime, timedelta
+from skill import coinmarketcap
+from skill.catalog import CoinIndex
 from skill.coinmarketcap import CoinMarketCap
 
 
@@ -70,3 +75,119 @@ class CoinMarketCapTestCase(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.coin_market_cap.current('foobarcoin')
             
+
+
+class HistoricGapsTestCase(unittest.TestCase):
+    """
+    Test case for the days CoinMarketCap().historic() scrapes.
+    """
+    def setUp(self):
+        coinmarketcap.store.clear()
+        self.history = mock.Mock()
+        self.history.read.return_value = []
+
+        index = CoinIndex([{
+            'id': 1, 'name': 'Bitcoin', 'symbol': 'BTC', 'website_slug': 'bitcoin'
+        }])
+        patches = [
+            mock.patch.object(CoinMarketCap, 'index', return_value=index),
+            mock.patch.object(coinmarketcap, 'PriceHistory', return_value=self.history),
+            mock.patch.object(CoinMarketCap, '_CoinMarketCap__scrape_historic',
+                              return_value=[])
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.scrape = CoinMarketCap._CoinMarketCap__scrape_historic
+
+    def test_only_missing_days_are_scraped(self):
+        """
+        CoinMarketCap().historic() scrapes the days before and after the stored ones.
+        """
+        yesterday = datetime.now().date() - timedelta(days=1)
+        self.history.bounds.return_value = (date(2018, 8, 10), yesterday - timedelta(days=2))
+
+        CoinMarketCap.historic('bitcoin', '20180801', yesterday.strftime('%Y%m%d'))
+
+        self.scrape.assert_has_calls([
+            mock.call('bitcoin', date(2018, 8, 1), date(2018, 8, 9)),
+            mock.call('bitcoin', yesterday - timedelta(days=1), yesterday)
+        ])
+        self.history.cover.assert_has_calls([
+            mock.call('bitcoin', date(2018, 8, 1), date(2018, 8, 9)),
+            mock.call('bitcoin', yesterday - timedelta(days=1), yesterday)
+        ])
+
+    def test_covered_days_are_not_scraped(self):
+        """
+        CoinMarketCap().historic() does not scrape stored or checked days.
+        """
+        self.history.bounds.return_value = (date(2018, 8, 1), date(2018, 8, 31))
+
+        CoinMarketCap.historic('bitcoin', '20180801', '20180831')
+
+        self.scrape.assert_not_called()
+        self.history.read.assert_called_once_with(
+            'bitcoin', date(2018, 8, 1), date(2018, 8, 31))
+
+    def test_failed_scrapes_are_not_covered(self):
+        """
+        CoinMarketCap().historic() returns the stored days when scraping fails.
+        """
+        self.history.bounds.return_value = (date(2018, 8, 10), date(2018, 8, 31))
+        self.history.read.return_value = [{'date': '2018-08-10'}]
+        self.scrape.side_effect = requests.RequestException
+
+        results = CoinMarketCap.historic('bitcoin', '20180801', '20180831')
+
+        self.assertEqual(results, [{'date': '2018-08-10'}])
+        self.history.cover.assert_not_called()
+
+    def test_days_not_yet_published_are_not_covered(self):
+        """
+        CoinMarketCap().historic() leaves today unchecked.
+        """
+        today = datetime.now().date()
+        self.history.bounds.return_value = (None, None)
+
+        CoinMarketCap.historic('bitcoin', (today - timedelta(days=3)).strftime('%Y%m%d'),
+                               today.strftime('%Y%m%d'))
+
+        self.scrape.assert_called_once_with('bitcoin', today - timedelta(days=3), today)
+        self.history.cover.assert_called_once_with(
+            'bitcoin', today - timedelta(days=3), today - timedelta(days=1))
+
+    def test_database_errors_fall_back_to_scraping(self):
+        """
+        CoinMarketCap().historic() scrapes the whole period if
+        scraped days cannot be stored.
+        """
+        self.history.bounds.return_value = (date(2018, 8, 10), date(2018, 8, 31))
+        self.history.save.side_effect = psycopg2.Error
+        self.scrape.return_value = [{'date': '2018-08-01'}]
+
+        results = CoinMarketCap.historic('bitcoin', '20180801', '20180831')
+
+        self.assertEqual(results, [{'date': '2018-08-01'}])
+        self.scrape.assert_called_with('bitcoin', date(2018, 8, 1), date(2018, 8, 31))
+        self.history.read.assert_not_called()
+
+
+class ScrapeHistoricTestCase(unittest.TestCase):
+    """
+    Test case for the parsing of CoinMarketCap's historical data.
+    """
+    def test_periods_without_prices_are_empty(self):
+        """
+        CoinMarketCap().historic() parses a table without prices as no days.
+        """
+        response = mock.Mock(content=b"""
+            <table><thead><tr><th>Date</th><th>Open*</th></tr></thead>
+            <tbody><tr><td colspan="7">No data was found for the
+            selected time period.</td></tr></tbody></table>
+            """)
+        with mock.patch.object(coinmarketcap.requests, 'get', return_value=response):
+            records = CoinMarketCap._CoinMarketCap__scrape_historic(
+                'bitcoin', date(2013, 1, 1), date(2013, 1, 31))
+
+        self.assertEqual(records, [])
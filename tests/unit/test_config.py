@@ -0,0 +1,73 @@
+"""
+Unit tests for the TrainingConfig class.
+"""
+import os
+import json
+import tempfile
+import unittest
+
+from skill.config import TrainingConfig
+
+
+class TrainingConfigTestCase(unittest.TestCase):
+    """
+    Test case for the TrainingConfig() class.
+    """
+    def test_environment_overrides_file(self):
+        """
+        TrainingConfig.load() prefers environment variables over files.
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump({'epochs': 10, 'window': 3}, f)
+            f.flush()
+
+            os.environ['W2V_EPOCHS'] = '20'
+            try:
+                config = TrainingConfig.load(f.name)
+            finally:
+                del os.environ['W2V_EPOCHS']
+
+        self.assertEqual(config.epochs, 20)
+        self.assertEqual(config.window, 3)
+
+    def test_word2vec_kwargs_exclude_training_loop_settings(self):
+        """
+        TrainingConfig().word2vec_kwargs() only has gensim settings.
+        """
+        kwargs = TrainingConfig(min_count=1).word2vec_kwargs()
+        self.assertEqual(kwargs['min_count'], 1)
+        self.assertNotIn('epochs', kwargs)
+        self.assertNotIn('patience', kwargs)
+
+    def test_other_settings_are_passed_to_word2vec(self):
+        """
+        TrainingConfig().word2vec_kwargs() passes other gensim settings through.
+        """
+        config = TrainingConfig(sg=1, hs=1, seed=42)
+        kwargs = config.word2vec_kwargs()
+        self.assertEqual((kwargs['sg'], kwargs['hs'], kwargs['seed']), (1, 1, 42))
+        self.assertEqual(TrainingConfig(**config.as_dict()).word2vec_kwargs(), kwargs)
+
+    def test_invalid_settings_raise_value_error(self):
+        """
+        TrainingConfig() raises ValueError for invalid known settings.
+        """
+        with self.assertRaises(ValueError):
+            TrainingConfig(epochs=-1)
+        with self.assertRaises(ValueError):
+            TrainingConfig(window='5')
+        with self.assertRaises(ValueError):
+            TrainingConfig(sentences=[])
+
+    def test_settings_that_must_be_positive(self):
+        """
+        TrainingConfig() raises ValueError for zero epochs, workers,
+        size, evaluation interval or patience.
+        """
+        for key in ['epochs', 'workers', 'size', 'evaluate_every', 'patience']:
+            with self.subTest(key=key):
+                with self.assertRaises(ValueError):
+                    TrainingConfig(**{key: 0})
+                self.assertEqual(getattr(TrainingConfig(**{key: 1}), key), 1)
+
+        self.assertEqual(TrainingConfig(min_count=0).min_count, 0)
@@ -0,0 +1,39 @@
+"""
+Unit tests for the Corpus class.
+"""
+import os
+import tempfile
+import unittest
+
+from skill.corpus import Corpus
+
+
+class CorpusTestCase(unittest.TestCase):
+    """
+    Test case for the Corpus() class.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'corpus.txt')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_corpus_streams_sentences(self):
+        """
+        Corpus() yields one list of words per line.
+        """
+        corpus = Corpus.write(
+            ['bitcoin prices soar\nethereum prices slow down', ''], self.path)
+
+        self.assertEqual(list(corpus), [
+            ['bitcoin', 'prices', 'soar'],
+            ['ethereum', 'prices', 'slow', 'down']
+        ])
+
+    def test_corpus_is_restartable(self):
+        """
+        Corpus() can be iterated over more than once.
+        """
+        corpus = Corpus.write(['bitcoin prices soar'], self.path)
+        self.assertEqual(list(corpus), list(corpus))
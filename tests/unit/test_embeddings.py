@@ -0,0 +1,136 @@
+"""
+Unit tests for the coin embeddings.
+"""
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from skill.embeddings import CoinVectors, embeddings_path, quantization_report
+from skill.related import related_coins
+
+
+class CoinVectorsTestCase(unittest.TestCase):
+    """
+    Test case for the CoinVectors class.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.coins = [
+            {'name': 'Bitcoin', 'website_slug': 'bitcoin'},
+            {'name': 'Litecoin', 'website_slug': 'litecoin'},
+            {'name': 'Monero', 'website_slug': 'monero'},
+            {'name': 'Fluttercoin', 'website_slug': 'fluttercoin'}
+        ]
+        cls.vectors = {
+            'bitcoin': np.array([1.0, 0.0]),
+            'litecoin': np.array([0.9, 0.1]),
+            'monero': np.array([0.0, 1.0]),
+            'block': np.array([0.5, 0.5])
+        }
+
+    def test_only_coins_are_extracted(self):
+        """
+        CoinVectors.from_vectors() keeps coins in the vocabulary only.
+        """
+        embeddings = CoinVectors.from_vectors(self.vectors, self.coins)
+        self.assertEqual(embeddings.names, ['bitcoin', 'litecoin', 'monero'])
+        self.assertNotIn('block', embeddings)
+        self.assertNotIn('fluttercoin', embeddings)
+
+    def test_saved_embeddings_load_with_same_content(self):
+        """
+        CoinVectors.load() returns the embeddings written by save().
+        """
+        embeddings = CoinVectors.from_vectors(
+            self.vectors, self.coins, dtype='float16')
+        with tempfile.TemporaryDirectory() as directory:
+            path = embeddings_path(os.path.join(directory, '2018W32.model'))
+            embeddings.save(path)
+            loaded = CoinVectors.load(path)
+
+        self.assertEqual(loaded.names, embeddings.names)
+        self.assertEqual(loaded.vectors.dtype, np.float16)
+        np.testing.assert_array_equal(loaded.vectors, embeddings.vectors)
+
+    def test_related_coins_match_full_vectors(self):
+        """
+        related_coins() gives the same results on the coin embeddings.
+        """
+        embeddings = CoinVectors.from_vectors(self.vectors, self.coins)
+        self.assertEqual(
+            related_coins(embeddings, self.coins),
+            related_coins(self.vectors, self.coins))
+
+    def test_int8_embeddings_restore_vectors(self):
+        """
+        CoinVectors.quantize('int8') keeps vectors within one scale step.
+        """
+        embeddings = CoinVectors.from_vectors(self.vectors, self.coins)
+        quantized = embeddings.quantize('int8')
+
+        self.assertEqual(quantized.vectors.dtype, np.int8)
+        np.testing.assert_allclose(
+            quantized.dequantize(), embeddings.vectors, atol=1 / 127)
+
+    def test_int8_embeddings_load_with_scales(self):
+        """
+        CoinVectors.load() restores the scales of int8 embeddings.
+        """
+        quantized = CoinVectors.from_vectors(
+            self.vectors, self.coins, dtype='int8')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, '2018W32.coins.npz')
+            quantized.save(path)
+            loaded = CoinVectors.load(path)
+
+        np.testing.assert_array_equal(loaded.scales, quantized.scales)
+        np.testing.assert_array_equal(loaded['bitcoin'], quantized['bitcoin'])
+
+    def test_unsupported_dtype_raises(self):
+        """
+        CoinVectors.quantize() rejects unknown types.
+        """
+        embeddings = CoinVectors.from_vectors(self.vectors, self.coins)
+        with self.assertRaises(ValueError):
+            embeddings.quantize('int4')
+
+    def test_quantization_report(self):
+        """
+        quantization_report() compares sizes and related coins with float32.
+        """
+        embeddings = CoinVectors.from_vectors(self.vectors, self.coins)
+        report = quantization_report(embeddings, self.coins, limit=1)
+
+        self.assertEqual(set(report), {'float32', 'float16', 'int8'})
+        self.assertEqual(report['float16']['bytes'], report['float32']['bytes'] // 2)
+        self.assertEqual(report['int8']['overlap'], 1.0)
+
+    def test_extended_embeddings_keep_type(self):
+        """
+        CoinVectors().extend() adds missing coins with the same type.
+        """
+        coins = self.coins[:2]
+        embeddings = CoinVectors.from_vectors(self.vectors, coins, dtype='int8')
+        extended = embeddings.extend(self.vectors, self.coins)
+
+        self.assertEqual(extended.names, ['bitcoin', 'litecoin', 'monero'])
+        self.assertEqual(extended.dtype, 'int8')
+        np.testing.assert_allclose(
+            extended['monero'], self.vectors['monero'], atol=1 / 127)
+        np.testing.assert_array_equal(extended['bitcoin'], embeddings['bitcoin'])
+
+    def test_empty_embeddings_are_extended(self):
+        """
+        CoinVectors().extend() adds coins to embeddings without any coin.
+        """
+        for dtype in CoinVectors.DTYPES:
+            with self.subTest(dtype=dtype):
+                embeddings = CoinVectors.from_vectors(self.vectors, self.coins[3:], dtype=dtype)
+                self.assertEqual(len(embeddings), 0)
+                self.assertEqual(embeddings.vectors.ndim, 2)
+
+                extended = embeddings.extend(self.vectors, self.coins)
+                self.assertEqual(extended.names, ['bitcoin', 'litecoin', 'monero'])
+                self.assertEqual(extended.dtype, dtype)
+                self.assertEqual(extended.vector_size, 2)
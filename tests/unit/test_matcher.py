@@ -0,0 +1,68 @@
+"""
+Unit tests for the CoinMatcher class.
+"""
+import unittest
+
+from skill.matcher import CoinMatcher
+
+
+class CoinMatcherTestCase(unittest.TestCase):
+    """
+    Test case for the CoinMatcher() class.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.matcher = CoinMatcher(
+            ['Bitcoin', 'Bitcoin Cash', 'Litecoin'], ['BTC', 'BCH', 'LTC'])
+
+    def test_finds_names_and_plurals(self):
+        """
+        CoinMatcher().find() finds names and plurals ignoring case.
+        """
+        result = self.matcher.find('bitcoin BITCOINS')
+        self.assertEqual(result[0]['name'], [(0, 7)])
+        self.assertEqual(result[0]['plural'], [(8, 16)])
+
+    def test_symbols_are_case_sensitive(self):
+        """
+        CoinMatcher().find() only finds symbols with matching case.
+        """
+        result = self.matcher.find('LTC ltc')
+        self.assertEqual(result[2]['symbol'], [(0, 3)])
+
+    def test_respects_word_boundaries(self):
+        """
+        CoinMatcher().find() only matches whole words.
+        """
+        self.assertEqual(self.matcher.find('bitcoinish xBTC'), {})
+
+    def test_overlapping_coins_are_found(self):
+        """
+        CoinMatcher().find() finds coins whose names contain other coins.
+        """
+        result = self.matcher.find('Bitcoin Cash')
+        self.assertEqual(result[0]['name'], [(0, 7)])
+        self.assertEqual(result[1]['name'], [(0, 12)])
+
+    def test_added_and_removed_coins(self):
+        """
+        CoinMatcher().add() and remove() change the coins found.
+        """
+        matcher = CoinMatcher(['Bitcoin', 'Litecoin'], ['BTC', 'LTC'])
+        matcher.add(2, 'Monero', 'XMR')
+        matcher.remove(0, 'Bitcoin', 'BTC')
+
+        result = matcher.find('Bitcoin BTC Litecoin Monero XMR')
+        self.assertEqual(sorted(result), [1, 2])
+        self.assertEqual(result[2]['name'], [(21, 27)])
+        self.assertEqual(result[2]['symbol'], [(28, 31)])
+
+    def test_coins_are_found_by_id(self):
+        """
+        CoinMatcher.from_coins() reports coins by id.
+        """
+        matcher = CoinMatcher.from_coins([
+            {'id': 1, 'name': 'Bitcoin', 'symbol': 'BTC'},
+            {'id': 328, 'name': 'Monero', 'symbol': 'XMR'}
+        ])
+        self.assertEqual(sorted(matcher.find('Bitcoin XMR')), [1, 328])
@@ -0,0 +1,74 @@
+"""
+Unit tests for the PriceHistory class.
+"""
+import os
+import unittest
+
+from datetime import date
+from skill.storage import Storage
+from skill.prices import PriceHistory
+
+
+class PriceHistoryTestCase(unittest.TestCase):
+    """
+    Test case for the PriceHistory() class.
+    """
+    def setUp(self):
+        self.history = PriceHistory()
+        self.records = [{
+            'date': f'2018-08-0{day}',
+            'open': 1.0 * day,
+            'high': 2.0 * day,
+            'low': 0.5 * day,
+            'close': 1.5 * day,
+            'volume': None,
+            'market_cap': 100.0 * day
+        } for day in range(1, 4)]
+
+    def tearDown(self):
+        with Storage(os.getenv('POSTGRES_URI')) as S:
+            S.execute("DELETE FROM price_history WHERE slug = 'test-coin'")
+            S.execute("DELETE FROM price_history_coverage WHERE slug = 'test-coin'")
+
+    def test_saved_prices_are_read_by_range(self):
+        """
+        PriceHistory().read() returns the stored days within a range.
+        """
+        self.history.save('test-coin', self.records)
+
+        results = self.history.read('test-coin', date(2018, 8, 2), date(2018, 8, 3))
+        self.assertEqual(results, self.records[1:])
+
+    def test_stored_days_are_kept(self):
+        """
+        PriceHistory().save() keeps days that are already stored.
+        """
+        self.history.save('test-coin', self.records)
+        changed = [dict(record, close=0.0) for record in self.records]
+        self.assertEqual(self.history.save('test-coin', changed), 0)
+
+        results = self.history.read('test-coin', date(2018, 8, 1), date(2018, 8, 3))
+        self.assertEqual(results, self.records)
+
+    def test_bounds_of_stored_days(self):
+        """
+        PriceHistory().bounds() returns the first and last stored days.
+        """
+        self.assertEqual(self.history.bounds('test-coin'), (None, None))
+
+        self.history.save('test-coin', self.records)
+        self.assertEqual(
+            self.history.bounds('test-coin'), (date(2018, 8, 1), date(2018, 8, 3)))
+
+    def test_bounds_include_covered_days(self):
+        """
+        PriceHistory().bounds() includes the days checked without prices.
+        """
+        self.history.cover('test-coin', date(2018, 7, 1), date(2018, 7, 31))
+        self.assertEqual(
+            self.history.bounds('test-coin'), (date(2018, 7, 1), date(2018, 7, 31)))
+
+        self.history.save('test-coin', self.records)
+        self.history.cover('test-coin', date(2018, 7, 15), date(2018, 8, 3))
+        self.assertEqual(
+            self.history.bounds('test-coin'), (date(2018, 7, 1), date(2018, 8, 3)))
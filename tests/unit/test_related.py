@@ -0,0 +1,104 @@
+"""
+Unit tests for the related coins computation.
+"""
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from skill.related import (related_coins, related_path, save_related,
+                           load_related, update_related)
+
+
+class RelatedCoinsTestCase(unittest.TestCase):
+    """
+    Test case for the related_coins() function.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.coins = [
+            {'name': 'Bitcoin', 'website_slug': 'bitcoin'},
+            {'name': 'Litecoin', 'website_slug': 'litecoin'},
+            {'name': 'Monero', 'website_slug': 'monero'},
+            {'name': 'Fluttercoin', 'website_slug': 'fluttercoin'}
+        ]
+        cls.vectors = {
+            'bitcoin': np.array([1.0, 0.0]),
+            'litecoin': np.array([0.9, 0.1]),
+            'monero': np.array([0.0, 1.0])
+        }
+
+    def test_related_coins_are_sorted(self):
+        """
+        related_coins() returns coins from most to least similar.
+        """
+        results = related_coins(self.vectors, self.coins)
+        self.assertEqual(
+            [c['slug'] for c in results['bitcoin']], ['litecoin', 'monero'])
+
+        values = [c['value'] for c in results['bitcoin']]
+        self.assertEqual(values, sorted(values, reverse=True))
+
+    def test_related_coins_exclude_coin_itself(self):
+        """
+        related_coins() never relates a coin to itself.
+        """
+        results = related_coins(self.vectors, self.coins)
+        for key, related in results.items():
+            self.assertNotIn(key, [c['name'].lower() for c in related])
+
+    def test_related_coins_respects_limit(self):
+        """
+        related_coins() keeps at most `limit` coins per coin.
+        """
+        results = related_coins(self.vectors, self.coins, limit=1)
+        for related in results.values():
+            self.assertEqual(len(related), 1)
+
+    def test_coins_without_vectors_are_skipped(self):
+        """
+        related_coins() skips coins missing from the vocabulary.
+        """
+        results = related_coins(self.vectors, self.coins)
+        self.assertNotIn('fluttercoin', results)
+
+    def test_saved_table_loads_with_same_content(self):
+        """
+        load_related() returns the table written by save_related().
+        """
+        results = related_coins(self.vectors, self.coins)
+        with tempfile.TemporaryDirectory() as directory:
+            path = related_path(os.path.join(directory, '2018W32.model'))
+            save_related(results, path)
+
+            self.assertEqual(load_related(path), results)
+
+    def test_updated_table_matches_full_computation(self):
+        """
+        update_related() gives the same table as related_coins() on the
+        updated catalog.
+        """
+        vectors = dict(self.vectors, dogecoin=np.array([0.95, 0.05]))
+        added = [{'name': 'Dogecoin', 'website_slug': 'dogecoin'}]
+        removed = [self.coins[2]]
+        coins = [c for c in self.coins if c not in removed] + added
+
+        results = related_coins(vectors, self.coins, limit=1)
+        updated = update_related(
+            results, vectors, coins, added, removed, limit=1)
+
+        expected = related_coins(vectors, coins, limit=1)
+        self.assertEqual(set(updated), set(expected))
+        for key, related in expected.items():
+            self.assertEqual(
+                [c['slug'] for c in updated[key]], [c['slug'] for c in related])
+
+    def test_related_coins_for_selected_rows(self):
+        """
+        related_coins() only computes the rows that are requested.
+        """
+        results = related_coins(self.vectors, self.coins, rows=['monero'])
+        self.assertEqual(list(results), ['monero'])
+        self.assertEqual(
+            [c['slug'] for c in results['monero']],
+            [c['slug'] for c in related_coins(self.vectors, self.coins)['monero']])
@@ -3,10 +3,23 @@
 Tests for the Crypto class.
 """
 import os 
+import time
 import plotly
+import requests
+import tempfile
 import unittest
+import threading
+import numpy as np
+
+from unittest import mock
 from isoweek import Week
-from skill.skill import Crypto
+from skill import skill
+from skill.skill import Crypto, ModelState
+from skill.catalog import CoinIndex
+from skill.matcher import CoinMatcher
+from skill.embeddings import CoinVectors
+from skill.related import related_coins
+from skill.snapshot import save_snapshot, load_snapshot
 from tests.data import article_data
 
 
@@ -87,3 +100,224 @@ class CryptoTestCase(unittest.TestCase):
 
         results = self.skill.text(text=article_data, limit=1)
         assert len(results) == 1
+
+    def test_model_setting_swaps_state(self):
+        """
+        Crypto().model_setting() replaces the model state in one
+        assignment, leaving the previous state untouched.
+        """
+        previous = self.skill.state
+        self.skill.model_setting(model_path=previous.model_path, original=False)
+
+        assert self.skill.state is not previous
+        assert self.skill.model_path == previous.model_path
+        assert previous.comparison_results is not None
+
+    def test_refresh_catalog_without_changes(self):
+        """
+        Crypto().refresh_catalog() makes no changes when the listings
+        are the same.
+        """
+        result = self.skill.refresh_catalog()
+        assert result == {'added': 0, 'removed': 0}
+
+
+class CatalogRefreshTestCase(unittest.TestCase):
+    """
+    Test case for Crypto().refresh_catalog() with coin embeddings.
+    """
+    def setUp(self):
+        self.coins = [
+            {'id': 1, 'name': 'Bitcoin', 'symbol': 'BTC', 'website_slug': 'bitcoin'},
+            {'id': 2, 'name': 'Litecoin', 'symbol': 'LTC', 'website_slug': 'litecoin'},
+            {'id': 3, 'name': 'Monero', 'symbol': 'XMR', 'website_slug': 'monero'}
+        ]
+        self.new_coin = {
+            'id': 4, 'name': 'Dogecoin', 'symbol': 'DOGE', 'website_slug': 'dogecoin'
+        }
+        self.vectors = {
+            'bitcoin': np.array([1.0, 0.0]),
+            'litecoin': np.array([0.9, 0.1]),
+            'monero': np.array([0.0, 1.0]),
+            'dogecoin': np.array([0.95, 0.05])
+        }
+
+        #
+        #  The skill serves embeddings of the coins
+        #  listed at training time only.
+        #
+        state = ModelState('models/2018W32.model',
+                           related_coins(self.vectors, self.coins))
+        state.model = CoinVectors.from_vectors(self.vectors, self.coins)
+
+        self.skill = Crypto.__new__(Crypto)
+        self.skill.lock = threading.Lock()
+        self.skill.coins = self.coins
+        self.skill.index = CoinIndex(self.coins)
+        self.skill.matcher = CoinMatcher.from_coins(self.coins)
+        self.skill.BitcoinTalk = mock.Mock()
+        self.skill.state = state
+
+    def test_added_coins_get_related_coins(self):
+        """
+        Crypto().refresh_catalog() relates coins listed after training,
+        using the vectors of the whole vocabulary.
+        """
+        listings = self.coins + [self.new_coin]
+        with mock.patch.object(skill, 'filter_listings', return_value=listings), \
+                mock.patch.object(skill.CoinMarketCap, 'index'), \
+                mock.patch.object(ModelState, 'full_vectors',
+                                  return_value=self.vectors):
+            result = self.skill.refresh_catalog()
+
+        self.assertEqual(result, {'added': 1, 'removed': 0})
+        self.assertIn('dogecoin', self.skill.state.model)
+        self.assertEqual(
+            self.skill.comparison_results['dogecoin'][0]['slug'], 'bitcoin')
+        self.assertEqual(
+            self.skill.comparison_results['bitcoin'][0]['slug'], 'dogecoin')
+        self.assertIn(4, self.skill.matcher.find('Dogecoin'))
+
+    def test_model_changed_during_refresh(self):
+        """
+        Crypto().refresh_catalog() does not undo a model published
+        while it runs, and the new model relates the added coins.
+        """
+        state = ModelState('models/2018W33.model',
+                           related_coins(self.vectors, self.coins))
+        state.model = CoinVectors.from_vectors(self.vectors, self.coins)
+        swap = threading.Thread(target=self.skill.model_setting,
+                                args=('models/2018W33.model',), kwargs={'original': False})
+
+        def full_vectors(state):
+            if not swap.is_alive():
+                swap.start()
+                swap.join(0.1)
+            return self.vectors
+
+        listings = self.coins + [self.new_coin]
+        with mock.patch.object(skill, 'filter_listings', return_value=listings), \
+                mock.patch.object(skill.CoinMarketCap, 'index'), \
+                mock.patch.object(Crypto, 'resolve_model_path', side_effect=lambda path: path), \
+                mock.patch.object(Crypto, 'load_state', return_value=state), \
+                mock.patch.object(ModelState, 'full_vectors', autospec=True,
+                                  side_effect=full_vectors):
+            self.skill.refresh_catalog()
+            swap.join()
+
+        self.assertEqual(self.skill.model_path, 'models/2018W33.model')
+        self.assertIn('dogecoin', self.skill.state.model)
+        self.assertEqual(
+            self.skill.comparison_results['dogecoin'][0]['slug'], 'bitcoin')
+
+    def test_removed_coins_are_not_found(self):
+        """
+        Crypto().refresh_catalog() stops finding coins that are
+        no longer listed, and finds the others by id.
+        """
+        listings = self.coins[:2]
+        with mock.patch.object(skill, 'filter_listings', return_value=listings), \
+                mock.patch.object(skill.CoinMarketCap, 'index'):
+            result = self.skill.refresh_catalog()
+
+        self.assertEqual(result, {'added': 0, 'removed': 1})
+        found = self.skill.regex_crypto_currency_finder('Monero and LTC')
+        self.assertEqual([coin['cryptocurrency'] for coin in found], ['litecoin'])
+
+
+class StartupSnapshotTestCase(unittest.TestCase):
+    """
+    Test case for the startup snapshot of the Crypto() class.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'snapshot.json')
+        self.coins = [
+            {'id': 1, 'name': 'Bitcoin', 'symbol': 'BTC', 'website_slug': 'bitcoin'}
+        ]
+        self.created = time.time() - 120
+        save_snapshot(self.path, self.coins, 'models/2018W32.model', {},
+                      created=self.created)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_stale_coins_keep_snapshot_age(self):
+        """
+        Crypto() keeps the age of a stale snapshot when it cannot fetch
+        listings, even if it rewrites the snapshot for a new model.
+        """
+        def model_setting(crypto, model_path):
+            crypto.state = ModelState(model_path, {})
+
+        crypto = Crypto.__new__(Crypto)
+        with mock.patch.object(skill.CoinMarketCap, 'index',
+                               side_effect=requests.RequestException), \
+                mock.patch.object(skill, 'BitcoinTalk'), \
+                mock.patch.object(Crypto, 'resolve_model_path',
+                                  return_value='models/2018W33.model'), \
+                mock.patch.object(Crypto, 'model_setting', autospec=True,
+                                  side_effect=model_setting):
+            crypto._Crypto__initialize_variables(self.path, 60)
+
+        snapshot = load_snapshot(self.path)
+        self.assertEqual(crypto.coins, self.coins)
+        self.assertEqual(snapshot['model_path'], 'models/2018W33.model')
+        self.assertEqual(snapshot['created'], self.created)
+
+
+class DetectionTestCase(unittest.TestCase):
+    """
+    Test case for the coins found by the Crypto() class.
+    """
+    def setUp(self):
+        #
+        #  Listings are in rank order, which
+        #  differs from the order of ids.
+        #
+        self.coins = [
+            {'id': 52, 'name': 'Ripple', 'symbol': 'XRP', 'website_slug': 'ripple'},
+            {'id': 1, 'name': 'Bitcoin', 'symbol': 'BTC', 'website_slug': 'bitcoin'}
+        ]
+        self.skill = Crypto.__new__(Crypto)
+        self.skill.coins = self.coins
+        self.skill.index = CoinIndex(self.coins)
+        self.skill.matcher = CoinMatcher.from_coins(self.coins)
+        self.skill.state = ModelState('models/2018W32.model', {})
+        self.skill.BitcoinTalk = mock.Mock()
+        self.skill.BitcoinTalk.latest_messages.side_effect = lambda names: [''] * len(names)
+
+    def test_ties_are_broken_by_rank(self):
+        """
+        Crypto().text() keeps the highest ranked coin among
+        coins found the same number of times.
+        """
+        results = self.skill.text('Bitcoin and Ripple', limit=1)
+        self.assertEqual([r['entities'][0]['name'] for r in results], ['Ripple'])
+
+    def test_findings_follow_rank(self):
+        """
+        Crypto().regex_crypto_currency_finder() lists coins in rank order.
+        """
+        results = self.skill.regex_crypto_currency_finder('BTC Bitcoin XRP Ripple')
+        self.assertEqual(
+            [r['cryptocurrency'] for r in results], ['ripple', 'bitcoin'])
+
+    def test_latest_messages_are_fetched_at_once(self):
+        """
+        Crypto().text() fetches the links of found and related coins
+        with a single call.
+        """
+        self.skill.state.comparison_results['ripple'] = [
+            {'name': 'Bitcoin', 'slug': 'bitcoin', 'value': 0.9, 'url': ''}
+        ]
+        self.skill.BitcoinTalk.latest_messages.side_effect = \
+            lambda names: [f'link-{name}' for name in names]
+
+        results = self.skill.text('Ripple and Bitcoin', limit=2)
+
+        self.skill.BitcoinTalk.latest_messages.assert_called_once_with(
+            ['Ripple', 'Bitcoin'])
+        entity = results[0]['entities'][0]
+        self.assertEqual(entity['url'], 'link-Ripple')
+        self.assertEqual(entity['related'][0]['url'], 'link-Bitcoin')
@@ -0,0 +1,82 @@
+"""
+Unit tests for the startup snapshot.
+"""
+import os
+import json
+import tempfile
+import unittest
+
+from skill.snapshot import save_snapshot, load_snapshot, is_stale
+
+
+class SnapshotTestCase(unittest.TestCase):
+    """
+    Test case for the startup snapshot functions.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'snapshot.json')
+        self.coins = [
+            {'name': 'Bitcoin', 'symbol': 'BTC', 'website_slug': 'bitcoin'},
+            {'name': 'Litecoin', 'symbol': 'LTC', 'website_slug': 'litecoin'}
+        ]
+        self.related = {
+            'bitcoin': [{
+                'name': 'Litecoin',
+                'slug': 'litecoin',
+                'value': 0.9,
+                'url': ''
+            }]
+        }
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_saved_snapshot_loads_with_same_content(self):
+        """
+        load_snapshot() returns the state written by save_snapshot().
+        """
+        save_snapshot(self.path, self.coins, 'models/2018W32.model', self.related)
+        snapshot = load_snapshot(self.path)
+
+        self.assertEqual(snapshot['coins'], self.coins)
+        self.assertEqual(snapshot['model_path'], 'models/2018W32.model')
+        self.assertEqual(snapshot['related'], self.related)
+
+    def test_missing_snapshot_returns_none(self):
+        """
+        load_snapshot() returns None if there is no snapshot.
+        """
+        self.assertIsNone(load_snapshot(self.path))
+
+    def test_snapshot_from_other_version_is_ignored(self):
+        """
+        load_snapshot() returns None for snapshots of other versions.
+        """
+        save_snapshot(self.path, self.coins, 'models/2018W32.model', self.related)
+        with open(self.path) as f:
+            snapshot = json.load(f)
+        snapshot['version'] = 0
+        with open(self.path, 'w') as f:
+            json.dump(snapshot, f)
+
+        self.assertIsNone(load_snapshot(self.path))
+
+    def test_snapshot_staleness(self):
+        """
+        is_stale() compares the age of a snapshot with a maximum age.
+        """
+        save_snapshot(self.path, self.coins, 'models/2018W32.model', self.related)
+        snapshot = load_snapshot(self.path)
+
+        self.assertFalse(is_stale(snapshot, 60))
+        snapshot['created'] -= 120
+        self.assertTrue(is_stale(snapshot, 60))
+
+    def test_snapshot_keeps_given_creation_time(self):
+        """
+        save_snapshot() stores the given creation time.
+        """
+        save_snapshot(self.path, self.coins, 'models/2018W32.model', self.related,
+                      created=1534000000.0)
+        self.assertEqual(load_snapshot(self.path)['created'], 1534000000.0)
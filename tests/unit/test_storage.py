@@ -6,7 +6,9 @@ import os
 import json
 import asyncio
 import unittest
+import threading
 
+from psycopg2.pool import PoolError
 from skill.storage import Storage
 from datetime import datetime, timedelta
 
@@ -39,3 +41,75 @@ class StorageTestCase(unittest.TestCase):
             self.assertTrue(r)
 
         self.assertNotEqual(self.storage.connection.closed, 0)
+
+    def test_pooled_connections_are_returned(self):
+        """
+        Storage(pool=True) returns its connection to the pool.
+        """
+        Storage.create_pool()
+        with Storage(uri=os.getenv('POSTGRES_URI'), pool=True) as S:
+            S.execute('SELECT TRUE AS connected')
+            self.assertEqual(Storage.pool_stats()['in_use'], 1)
+
+        stats = Storage.pool_stats()
+        self.assertEqual(stats['in_use'], 0)
+        self.assertEqual(stats['borrowed'], stats['returned'])
+        Storage.close_pool()
+
+    def test_exhausted_pool_waits_for_a_connection(self):
+        """
+        Storage(pool=True) waits for a connection when all are in use.
+        """
+        Storage.create_pool(minconn=0, maxconn=1, timeout=5)
+        opened = []
+
+        def borrow():
+            with Storage(uri=os.getenv('POSTGRES_URI'), pool=True) as S:
+                opened.append(S.execute('SELECT TRUE AS connected')[0]['connected'])
+
+        with Storage(uri=os.getenv('POSTGRES_URI'), pool=True):
+            thread = threading.Thread(target=borrow)
+            thread.start()
+            thread.join(0.2)
+            self.assertEqual(opened, [])
+
+        thread.join()
+        self.assertEqual(opened, [True])
+        self.assertEqual(Storage.pool_stats()['in_use'], 0)
+        Storage.close_pool()
+
+    def test_exhausted_pool_times_out(self):
+        """
+        Storage(pool=True) raises PoolError if no connection frees up in time.
+        """
+        Storage.create_pool(minconn=0, maxconn=1, timeout=0.1)
+        with Storage(uri=os.getenv('POSTGRES_URI'), pool=True):
+            with self.assertRaises(PoolError):
+                Storage(uri=os.getenv('POSTGRES_URI'), pool=True).open()
+
+        self.assertEqual(Storage.pool_stats()['in_use'], 0)
+        Storage.close_pool()
+
+    def test_pool_starts_without_database(self):
+        """
+        Storage.create_pool() opens no connection by default.
+        """
+        uri = os.environ.get('POSTGRES_URI')
+        os.environ['POSTGRES_URI'] = 'postgresql://localhost:1/unavailable'
+        try:
+            self.assertEqual(Storage.create_pool().minconn, 0)
+        finally:
+            Storage.close_pool()
+            if uri is None:
+                del os.environ['POSTGRES_URI']
+            else:
+                os.environ['POSTGRES_URI'] = uri
+
+    def test_iterate_streams_all_rows(self):
+        """
+        Storage().iterate() yields every row in batches.
+        """
+        with Storage(os.getenv('POSTGRES_URI')) as S:
+            rows = S.iterate('SELECT generate_series(1, 10) AS n', size=3)
+            self.assertEqual([row['n'] for row in rows], list(range(1, 11)))
+            self.assertTrue(S.connection.autocommit)
@@ -3,6 +3,7 @@ Unit tests for the Word2Vec class.
 """
 import os
 import gensim
+import tempfile
 import unittest
 import psycopg2
 
@@ -10,8 +11,9 @@ from isoweek import Week
 from pathlib import Path
 
 from skill.skill import Crypto
-from skill.word2vec import Model
+from skill.word2vec import Model, PREPROCESSING_VERSION, load_nlp, clean_documents
 from skill.storage import Storage
+from skill.artifacts import read_manifest
 from skill.bitcointalk import BitcoinTalk
 
 
@@ -45,7 +47,16 @@ class Word2VecTestCase(unittest.TestCase):
                 DELETE FROM message
                     WHERE sid IN (1000000000, 1000000001, 1000000002, 1000000003)
                 """)
-    
+            S.execute("""
+                DELETE FROM message_tokens
+                    WHERE sid IN (1000000000, 1000000001, 1000000002, 1000000003)
+                """)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
 
     def test_corpus_create(self):
         """
@@ -53,12 +64,43 @@ class Word2VecTestCase(unittest.TestCase):
         input from the BitcoinTalk() class.
         """
         unclean = BitcoinTalk().all()
-        results = Model()._corpus_create(unclean)
+        results = Model()._corpus_create(unclean, self.directory.name)
 
         for result in results:
             assert type(result) == list
             assert len(result) >= 3
 
+    def test_parallel_corpus_matches_single_process(self):
+        """
+        Model()._corpus_create() creates the same corpus with
+        several worker processes as with a single one.
+        """
+        documents = list(BitcoinTalk().all())
+        single_directory = os.path.join(self.directory.name, 'single')
+        parallel_directory = os.path.join(self.directory.name, 'parallel')
+        os.mkdir(single_directory)
+        os.mkdir(parallel_directory)
+
+        single = Model()._corpus_create(documents, single_directory, workers=1)
+        parallel = Model()._corpus_create(
+            documents, parallel_directory, workers=2, shard_size=1)
+
+        assert list(single) == list(parallel)
+
+    def test_tokenized_messages_are_not_cleaned_again(self):
+        """
+        Model()._corpus_create() saves tokens so that messages are
+        no longer returned by BitcoinTalk().untokenized().
+        """
+        bitcointalk = BitcoinTalk()
+        corpus = Model()._corpus_create(
+            bitcointalk.untokenized(PREPROCESSING_VERSION), self.directory.name,
+            workers=1, version=PREPROCESSING_VERSION, write_corpus=False)
+
+        assert corpus is None
+        assert os.listdir(self.directory.name) == []
+        assert list(bitcointalk.untokenized(PREPROCESSING_VERSION)) == []
+
     def test_training_pipeline(self):
         """
         Model().train is able to train a model and place it 
@@ -77,8 +119,40 @@ class Word2VecTestCase(unittest.TestCase):
             min_count=1)
 
         last_week = str(Week.thisweek() - 1)
+        version = read_manifest(path)['version']
 
-        my_trained_file = Path(f'{path}/{last_week}.model')
+        my_trained_file = Path(f'{path}/{version}/{last_week}.model')
 
         assert my_trained_file.is_file()
+        assert Path(f'{path}/{version}/{last_week}.related.json').is_file()
+        assert Path(f'{path}/{version}/{last_week}.kv').is_file()
+        assert Path(f'{path}/{version}/{last_week}.kv.vectors.npy').is_file()
+        assert Path(f'{path}/{version}/{last_week}.coins.npz').is_file()
         assert type(trained) == gensim.models.word2vec.Word2Vec
+
+
+class CleanDocumentsTestCase(unittest.TestCase):
+    """
+    Test case for clean_documents().
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.nlp = load_nlp()
+
+    def test_every_sentence_is_kept(self):
+        """
+        clean_documents() keeps every sentence of a document,
+        including the last one.
+        """
+        documents = [
+            'Bitcoin prices soared yesterday evening. '
+            'Ethereum prices slowed considerably afterwards',
+            'Litecoin miners upgraded their hardware.'
+        ]
+        corpus = list(clean_documents(self.nlp, documents))
+
+        self.assertEqual(len(corpus), 2)
+        self.assertEqual(len(corpus[0]), 2)
+        self.assertEqual(corpus[0][0][:3], ['bitcoin', 'prices', 'soared'])
+        self.assertEqual(corpus[0][-1][:3], ['ethereum', 'prices', 'slowed'])
+        self.assertEqual(corpus[1], [['litecoin', 'miners', 'upgraded', 'hardware']])
@@ -0,0 +1,21 @@
+#!/usr/bin/python
+"""
+Script for training a word2vec model outside
+of the web-application process.
+"""
+import os
+
+from skill.word2vec import Model
+
+
+def main():
+    """
+    Lowers the priority of this process and trains a model.
+    The model is published to MODELS_PATH together with a
+    manifest, which the web-application watches.
+    """
+    os.nice(int(os.getenv('TRAINING_NICENESS', 10)))
+    Model().train()
+
+if __name__ == '__main__':
+    main()